@@ -1,6 +1,7 @@
 """Helper functions for the project as a whole."""
 from datetime import datetime, timedelta
 from time import perf_counter
+import pandas as pd
 import os
 
 
@@ -95,3 +96,22 @@ def read_write_lines(source_path: str, target_path: str, lines: int) -> None:
         with open(target_path, 'w') as target:
             for i in range(lines):
                 target.write(source.readline())
+
+
+def combine_date_and_time(dates: pd.Series, times: pd.Series) -> pd.Series:
+    """Combine a column of dates and a column of times into a column of timestamps, keeping the index of the dates.
+
+    Each distinct date and time is converted once, which avoids formatting and parsing a string per row, as split
+    data has few distinct dates and at most one distinct time per second of the day.
+
+    Args:
+        dates: The dates, as datetime.date objects or strings.
+        times: The times, as datetime.time objects or strings.
+    """
+    date_codes, distinct_dates = pd.factorize(dates)
+    time_codes, distinct_times = pd.factorize(times)
+
+    timestamps = pd.to_datetime(pd.Index(distinct_dates).astype(str)).to_numpy()[date_codes] + \
+        pd.to_timedelta(pd.Index(distinct_times).astype(str)).to_numpy()[time_codes]
+
+    return pd.Series(timestamps, index=dates.index)
@@ -0,0 +1,160 @@
+"""Module for interpolating vessel trajectories to a fixed tick, so that every tick holds a snapshot of the fleet."""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+INTERPOLATION_METHODS = ('linear', 'great-circle')
+
+
+def interpolate_tracks(dataframe: pd.DataFrame,
+                       *,
+                       tick: timedelta,
+                       max_gap: timedelta,
+                       method: str = 'linear'
+                       ) -> pd.DataFrame:
+    """Interpolate the track of each vessel to a fixed tick and return the interpolated dataframe.
+
+    Ticks are aligned to the epoch, so all vessels share the same ticks. Latitude and longitude are interpolated
+    between the two reports surrounding a tick, all other columns are taken from the latest report at or before the
+    tick. Ticks between two reports further apart than max_gap are left out, so vessels disappear instead of being
+    drawn through a long gap.
+
+    Args:
+        dataframe: The dataframe to interpolate. Must contain MMSI, TIMESTAMP, LATITUDE and LONGITUDE columns.
+        tick: The interval between two interpolated positions.
+        max_gap: The largest gap between two reports to interpolate across.
+        method: Either 'linear' for interpolating latitude and longitude directly or 'great-circle' for
+            interpolating along the great circle between the reports. (default: 'linear')
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f'Interpolation method must be one of {INTERPOLATION_METHODS}, got {method}.')
+
+    if dataframe.empty:
+        return dataframe
+
+    dataframe = dataframe.sort_values(by=['MMSI', 'TIMESTAMP'], kind='stable')
+    times = dataframe['TIMESTAMP'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    vessels = pd.factorize(dataframe['MMSI'], sort=True)[0]
+    starts = np.flatnonzero(np.r_[True, vessels[1:] != vessels[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+
+    ticks, tick_vessels = _vessel_ticks(times[starts], times[ends], pd.Timedelta(tick).value)
+    previous = _previous_reports(times, vessels, starts, ticks, tick_vessels)
+    following = np.minimum(previous + 1, ends[tick_vessels])
+    gap = times[following] - times[previous]
+
+    keep = (times[previous] == ticks) | (gap <= pd.Timedelta(max_gap).value)
+    ticks, previous, following, gap = ticks[keep], previous[keep], following[keep], gap[keep]
+
+    fraction = np.divide(ticks - times[previous], gap, out=np.zeros(len(ticks)), where=gap > 0)
+
+    latitudes = dataframe['LATITUDE'].to_numpy(dtype='float64')
+    longitudes = dataframe['LONGITUDE'].to_numpy(dtype='float64')
+    interpolate = _interpolate_great_circle if method == 'great-circle' else _interpolate_linear
+    latitude, longitude = interpolate(latitudes[previous], longitudes[previous],
+                                      latitudes[following], longitudes[following], fraction)
+
+    result = dataframe.iloc[previous].reset_index(drop=True)
+    result['TIMESTAMP'] = pd.to_datetime(ticks)
+    result['LATITUDE'] = latitude
+    result['LONGITUDE'] = longitude
+
+    result.sort_values(by=['TIMESTAMP'], inplace=True, kind='stable')
+    result.reset_index(inplace=True, drop=True)
+
+    return result
+
+
+def _vessel_ticks(first_times: np.ndarray, last_times: np.ndarray, tick_ns: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the ticks of all vessels, ordered by vessel then tick, along with the vessel of each tick.
+
+    Args:
+        first_times: The time of the first report of each vessel in nanoseconds.
+        last_times: The time of the last report of each vessel in nanoseconds.
+        tick_ns: The interval between two interpolated positions in nanoseconds.
+    """
+    # Ceil the first report to the tick, so the ticks are shared between vessels.
+    first_ticks = -(-first_times // tick_ns) * tick_ns
+    counts = np.maximum((last_times - first_ticks) // tick_ns + 1, 0)
+    tick_vessels = np.repeat(np.arange(len(counts)), counts)
+    positions = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return first_ticks[tick_vessels] + positions * tick_ns, tick_vessels
+
+
+def _previous_reports(times: np.ndarray,
+                      vessels: np.ndarray,
+                      starts: np.ndarray,
+                      ticks: np.ndarray,
+                      tick_vessels: np.ndarray
+                      ) -> np.ndarray:
+    """Return the position of the latest report of the same vessel at or before each tick.
+
+    Times are made relative to the first report of their vessel and offset by vessel, so a single binary search over
+    all vessels never crosses into another vessel.
+
+    Args:
+        times: The time of each report in nanoseconds, sorted by vessel then time.
+        vessels: The vessel of each report.
+        starts: The position of the first report of each vessel.
+        ticks: The ticks in nanoseconds, sorted by vessel then tick.
+        tick_vessels: The vessel of each tick.
+    """
+    relative = times - times[starts][vessels]
+    span = int(relative.max()) + 1
+    keys = vessels.astype('int64') * span + relative
+    tick_keys = tick_vessels.astype('int64') * span + ticks - times[starts][tick_vessels]
+
+    return np.searchsorted(keys, tick_keys, side='right') - 1
+
+
+def _interpolate_linear(latitude_from: np.ndarray,
+                        longitude_from: np.ndarray,
+                        latitude_to: np.ndarray,
+                        longitude_to: np.ndarray,
+                        fraction: np.ndarray
+                        ) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolate latitude and longitude linearly and return the interpolated latitudes and longitudes."""
+    latitude = latitude_from + fraction * (latitude_to - latitude_from)
+    longitude = longitude_from + fraction * (longitude_to - longitude_from)
+
+    return latitude, longitude
+
+
+def _interpolate_great_circle(latitude_from: np.ndarray,
+                              longitude_from: np.ndarray,
+                              latitude_to: np.ndarray,
+                              longitude_to: np.ndarray,
+                              fraction: np.ndarray
+                              ) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolate along the great circle between two positions and return the interpolated latitudes and longitudes.
+
+    Uses spherical linear interpolation of the unit vectors of the two positions, falling back to linear
+    interpolation of the vectors when the positions (nearly) coincide.
+    """
+    start = _to_unit_vector(latitude_from, longitude_from)
+    end = _to_unit_vector(latitude_to, longitude_to)
+
+    angle = np.arccos(np.clip(np.sum(start * end, axis=0), -1.0, 1.0))
+    sin_angle = np.sin(angle)
+    close = sin_angle < 1e-12
+    safe_sin_angle = np.where(close, 1.0, sin_angle)
+
+    weight_start = np.where(close, 1 - fraction, np.sin((1 - fraction) * angle) / safe_sin_angle)
+    weight_end = np.where(close, fraction, np.sin(fraction * angle) / safe_sin_angle)
+
+    x, y, z = weight_start * start + weight_end * end
+    latitude = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    longitude = np.degrees(np.arctan2(y, x))
+
+    return latitude, longitude
+
+
+def _to_unit_vector(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Convert latitudes and longitudes in degrees to an array of unit vectors with shape (3, n)."""
+    latitude = np.radians(latitude)
+    longitude = np.radians(longitude)
+
+    return np.array([np.cos(latitude) * np.cos(longitude),
+                     np.cos(latitude) * np.sin(longitude),
+                     np.sin(latitude)])
@@ -0,0 +1,61 @@
+"""Module for deriving the kinematics of each vessel from consecutive reports."""
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS = 6_371_000  # Mean radius of the earth in meters.
+METERS_PER_NAUTICAL_MILE = 1852
+
+KINEMATIC_COLUMNS = ['DISTANCE', 'IMPLIED SPEED', 'ACCELERATION', 'TURN RATE', 'TIME SINCE LAST']
+
+
+def add_kinematics(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Add the kinematics of each vessel since its previous report and return the dataframe sorted by time.
+
+    The following columns are added, all of which are empty for the first report of each vessel:
+    * DISTANCE: The haversine distance from the previous report in meters.
+    * IMPLIED SPEED: The distance divided by the time since the previous report in knots.
+    * ACCELERATION: The change in implied speed since the previous report in knots per second.
+    * TURN RATE: The change in course over ground since the previous report in degrees per minute, as used for ROT.
+    * TIME SINCE LAST: The time since the previous report in seconds.
+
+    Args:
+        dataframe: The dataframe to add the kinematics to. Must contain MMSI, TIMESTAMP, LATITUDE, LONGITUDE and COG
+            columns.
+    """
+    dataframe = dataframe.sort_values(by=['MMSI', 'TIMESTAMP'], kind='stable')
+    vessels = dataframe.groupby('MMSI', sort=False)
+
+    elapsed = vessels['TIMESTAMP'].diff().dt.total_seconds()
+    # Reports with the same timestamp have no meaningful rates.
+    elapsed_nonzero = elapsed.where(elapsed > 0)
+
+    distance = haversine(vessels['LATITUDE'].shift(), vessels['LONGITUDE'].shift(),
+                         dataframe['LATITUDE'], dataframe['LONGITUDE'])
+    implied_speed = distance / elapsed_nonzero / METERS_PER_NAUTICAL_MILE * 3600
+    course_change = (vessels['COG'].diff() + 180) % 360 - 180
+
+    dataframe['DISTANCE'] = distance
+    dataframe['IMPLIED SPEED'] = implied_speed
+    dataframe['ACCELERATION'] = implied_speed.groupby(dataframe['MMSI'], sort=False).diff() / elapsed_nonzero
+    dataframe['TURN RATE'] = course_change / elapsed_nonzero * 60
+    dataframe['TIME SINCE LAST'] = elapsed
+
+    dataframe.sort_values(by=['TIMESTAMP'], inplace=True, kind='stable')
+    dataframe.reset_index(inplace=True, drop=True)
+
+    return dataframe
+
+
+def haversine(latitude_from: pd.Series,
+              longitude_from: pd.Series,
+              latitude_to: pd.Series,
+              longitude_to: pd.Series
+              ) -> pd.Series:
+    """Return the great-circle distance in meters between two series of positions given in degrees."""
+    latitude_from, longitude_from = np.radians(latitude_from), np.radians(longitude_from)
+    latitude_to, longitude_to = np.radians(latitude_to), np.radians(longitude_to)
+
+    a = np.sin((latitude_to - latitude_from) / 2) ** 2 + \
+        np.cos(latitude_from) * np.cos(latitude_to) * np.sin((longitude_to - longitude_from) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
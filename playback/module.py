@@ -4,10 +4,22 @@ from datetime import datetime, timedelta, time
 from time import perf_counter, sleep
 from playback.processors import Printer
 from playback.processors.playback_processor import PlaybackProcessor
+from playback.interpolation import interpolate_tracks, INTERPOLATION_METHODS
+from playback.sharding import play_sharded
+from playback.kinematics import add_kinematics, KINEMATIC_COLUMNS
+from playback.tail import SourceTail, WatermarkWindows
+from playback.tiling import tile_keys, tiles_in_extent, within_extent
+from splitter.catalog import read_catalog, plan_files
 import pandas as pd
+import pyarrow as pa
 import os
+import shutil
 import hashlib as hl
 
+PLAYERS = ('simple', 'extended')
+BASE_ROW_GROUP_SIZE = 10_000  # Rows per row group of each tile in the base data, bounding the time range of a group.
+BASE_MAX_OPEN_FILES = 64  # Tile files kept open while writing the base data, well below common file descriptor limits.
+
 
 class Playback:
     """A class for playing back AIS data from files."""
@@ -16,11 +28,16 @@ class Playback:
                  *,
                  source_path: str,
                  prepro_folder: str | None = None,
-                 subset: list[str | int] = None,  # Not used yet, but will be used to subset the data.
+                 subset: list[str | int] = None,
                  start_time: datetime.time = time.min,
                  stop_time: datetime.time = time.max,
                  player: str = 'simple',
-                 processor: PlaybackProcessor = Printer()
+                 extent: tuple[float, float, float, float] | None = None,
+                 processor: PlaybackProcessor = Printer(),
+                 interpolation: str | None = None,
+                 interpolation_tick: timedelta = timedelta(seconds=10),
+                 max_gap: timedelta = timedelta(minutes=10),
+                 memory_map: bool = False
                  ) -> None:
         """Initialise the playback class.
 
@@ -29,14 +46,36 @@ class Playback:
             prepro_folder: Defines both the path to load preprocessed data from and the path to save preprocessed data
             to if the data has not already been preprocessed. If None, the preprocessed data will not be saved.
             (default: None)
-            subset: A list of filters to derive a subset of data for playback. Not yet implemented.
-            If None, all vessels will be played back. (default: None)
+            subset: A list of MMSIs of the vessels to play back. If None, all vessels will be played back.
+            (default: None)
             start_time: The time to start playback. (default: 00:00:00)
             stop_time: The time to stop playback. (default: 23:59:59)
-            player: The player to use for playback. Determines how the data is loaded and played back.
+            player: The player to use for playback. Determines how the data is loaded and played back. Either
+            'simple' for the basic position reports, or 'extended' for the static vessel data, ROT, draught and
+            destination as well, along with the kinematics of each vessel derived during preprocessing.
             (default: 'simple')
+            extent: The area to play back as (min longitude, max longitude, min latitude, max latitude), the same
+            format as the extent of MapPlotter. Only the tiles of the preprocessed data overlapping the extent are
+            read. If None, all data will be played back. (default: None)
             processor: The processors class to use for processing the data. (default: Printer)
+            interpolation: If given, the track of each vessel is interpolated to a fixed tick during preprocessing,
+            so each tick holds a position for every vessel. Either 'linear' or 'great-circle'. If None, only the
+            raw reports are played back. (default: None)
+            interpolation_tick: The interval between two interpolated positions. (default: 10 seconds)
+            max_gap: The largest gap between two reports to interpolate across. (default: 10 minutes)
+            memory_map: If True, the derived data is stored as uncompressed Arrow IPC (Feather) and opened memory
+            mapped, so concurrent playbacks of the same data share the page cache instead of each decoding a private
+            copy. Requires a prepro_folder. (default: False)
         """
+        if memory_map and prepro_folder is None:
+            raise ValueError('memory_map requires a prepro_folder to store the derived data in.')
+
+        if player not in PLAYERS:
+            raise ValueError(f'Player must be one of {PLAYERS}.')
+
+        if interpolation is not None and interpolation not in INTERPOLATION_METHODS:
+            raise ValueError(f'Interpolation must be None or one of {INTERPOLATION_METHODS}.')
+
         # Path related variables
         self.source_path = source_path
         self.prepro_base_folder = os.path.join(prepro_folder, os.path.basename(source_path)) \
@@ -49,9 +88,17 @@ class Playback:
         self.start_time = start_time
         self.stop_time = stop_time
         self.player = player
+        self.extent = extent
+
+        # Derivation related variables
+        self.interpolation = interpolation
+        self.interpolation_tick = interpolation_tick
+        self.max_gap = max_gap
 
         # Other variables
+        self.memory_map = memory_map
         self.processor = processor
+        self.shard_results = []
 
     @property
     def hash_filter_parameters(self) -> str:
@@ -59,24 +106,51 @@ class Playback:
 
         Used to check if the derived data has already been preprocessed and stored in the preprocessed data folder.
         """
-        filter_parameters = (self.subset, self.start_time, self.stop_time, self.player)
+        filter_parameters = (self.subset, self.start_time, self.stop_time, self.player, self.extent,
+                             self.interpolation, self.interpolation_tick, self.max_gap)
         filter_parameters = str(filter_parameters).encode()
         filter_hash = hl.sha256(filter_parameters).hexdigest()
 
         return filter_hash
 
-    def play(self, speed: int = 1, no_sleep: bool = False) -> None:
+    @property
+    def derived_path(self) -> str:
+        """Return the path of the derived data file for the current filter parameters."""
+        extension = 'feather' if self.memory_map else 'parquet'
+
+        return os.path.join(self.prepro_derived_folder, f'{self.hash_filter_parameters}.{extension}')
+
+    def play(self, speed: int = 1, no_sleep: bool = False, shards: int = 1) -> None:
         """Play back AIS data from files by emitting groups of data for each time interval.
 
         Args:
             speed: The speed to play back the data. 1 is real time, 2 is twice as fast, etc. Must be between 1 and 900.
             no_sleep: If True, the playback will not sleep between emissions. (default: False)
+            shards: The number of worker processes to partition the vessels across. Each worker runs its own copy
+            of the processor on its vessels of every emission, and the results of the copies are stored in
+            shard_results. If 1, the playback runs in the current process. (default: 1)
         """
         if speed < 1 or speed > 900:
             raise ValueError('Speed must be between 1 and 900.')
 
+        if shards < 1:
+            raise ValueError('Shards must be at least 1.')
+
         dataframe = self._preprocess_or_load()
 
+        if shards > 1:
+            self._play_sharded(dataframe, speed, no_sleep, shards)
+        else:
+            self._play_locally(dataframe, speed, no_sleep)
+
+    def _play_locally(self, dataframe: pd.DataFrame, speed: int, no_sleep: bool) -> None:
+        """Emit the groups of data for each time interval to the processor in the current process.
+
+        Args:
+            dataframe: The dataframe to play back.
+            speed: The speed to play back the data.
+            no_sleep: If True, the playback will not sleep between emissions.
+        """
         self.processor.begun()
 
         for time_group, dataframe_group in dataframe.groupby(pd.Grouper(key='TIMESTAMP', freq=f'{speed}S')):
@@ -92,6 +166,113 @@ class Playback:
 
         self.processor.end()
 
+    def _play_sharded(self, dataframe: pd.DataFrame, speed: int, no_sleep: bool, shards: int) -> None:
+        """Emit the groups of data for each time interval to a copy of the processor in each of the worker processes.
+
+        Args:
+            dataframe: The dataframe to play back.
+            speed: The speed to play back the data.
+            no_sleep: If True, the playback will not sleep between emissions.
+            shards: The number of worker processes.
+        """
+        self.shard_results = play_sharded(dataframe,
+                                          processor=self.processor,
+                                          shards=shards,
+                                          speed=speed,
+                                          no_sleep=no_sleep)
+
+    def tail(self,
+             *,
+             window: timedelta = timedelta(seconds=1),
+             watermark_delay: timedelta = timedelta(seconds=5),
+             late_policy: str = 'drop',
+             poll_interval: float = 1.0,
+             idle_timeout: float | None = None
+             ) -> None:
+        """Play back AIS data live from a growing source path, emitting each window once its data is complete.
+
+        The source path is polled for rows appended to its files and for new files, which are read incrementally.
+        Each window is emitted once the watermark, the latest timestamp seen minus the watermark delay, has passed
+        its end. The latest timestamp seen includes rows removed by the filters. Filters are applied to the new rows,
+        but no preprocessing or derived data is used, so the extended player's kinematics and interpolation are not
+        available. Stop the tail with a keyboard interrupt or an idle timeout, after which the remaining windows are
+        emitted.
+
+        Args:
+            window: The length of the event time window of each emission. (default: 1 second)
+            watermark_delay: How long to wait for rows arriving out of order before emitting a window.
+            (default: 5 seconds)
+            late_policy: How to handle rows arriving after their window has been emitted. Either 'drop' to discard
+            them, 'emit' to emit them immediately as their own emission or 'next' to include them in the next
+            emitted window. (default: 'drop')
+            poll_interval: The number of seconds between polls of the source path. (default: 1.0)
+            idle_timeout: The number of seconds without new rows after which the tail stops. If None, the tail runs
+            until interrupted. (default: None)
+        """
+        windows = WatermarkWindows(window=window, watermark_delay=watermark_delay, late_policy=late_policy)
+
+        self.processor.begun()
+
+        try:
+            self._tail_source(SourceTail(self.source_path), windows, poll_interval, idle_timeout)
+        except KeyboardInterrupt:
+            print('Tail interrupted.')
+
+        self._emit_windows(windows.flush())
+
+        print(f'Tail ended with {windows.late_rows} late rows')
+
+        self.processor.end()
+
+    def _tail_source(self,
+                     source: SourceTail,
+                     windows: WatermarkWindows,
+                     poll_interval: float,
+                     idle_timeout: float | None
+                     ) -> None:
+        """Poll the source for new rows and emit the completed windows until the idle timeout is reached."""
+        last_rows_time = perf_counter()
+
+        while idle_timeout is None or perf_counter() - last_rows_time < idle_timeout:
+            dataframe = source.read_new()
+
+            if dataframe is not None:
+                last_rows_time = perf_counter()
+                self._emit_windows(self._add_tailed(windows, dataframe))
+
+            sleep(poll_interval)
+
+    def _add_tailed(self,
+                    windows: WatermarkWindows,
+                    dataframe: pd.DataFrame
+                    ) -> list[tuple[pd.Timestamp, pd.DataFrame]]:
+        """Prepare newly tailed source rows for playback and add them to the windows, returning the completed windows.
+
+        The rows are prepared the same way source data is prepared without preprocessing. The watermark advances with
+        the latest timestamp of all the new rows, before filters are applied, so windows are still completed while
+        only rows that are filtered away arrive.
+
+        Args:
+            windows: The windows to add the rows to.
+            dataframe: The newly tailed source rows.
+        """
+        self._date_and_time_to_timestamp(dataframe)
+
+        dataframe = dataframe[self._get_columns()]
+
+        return windows.add(self._apply_filters(dataframe), latest=dataframe['TIMESTAMP'].max())
+
+    def _emit_windows(self, emissions: list[tuple[pd.Timestamp, pd.DataFrame]]) -> None:
+        """Pass each emission to the processor.
+
+        Args:
+            emissions: The emissions as pairs of window start and rows.
+        """
+        for window_start, dataframe_group in emissions:
+            print(f'Emitting group: {window_start} with {dataframe_group.shape[0]} rows')
+
+            self.processor.process(dataframe_group)
+
     def _preprocess_or_load(self) -> pd.DataFrame:
         """Preprocess the data if it has not already been preprocessed, or load the preprocessed data if it has."""
         if self.prepro_base_folder is None:
@@ -102,11 +283,11 @@ class Playback:
         self._create_preprocessed_folders()
 
         print('Searching for preprocessed data...')
-        if not os.path.exists(os.path.join(self.prepro_base_folder, 'base.parquet')):
+        if not os.path.isdir(os.path.join(self.prepro_base_folder, 'base.parquet')):
             print('No preprocessed base data found.')
             self._preprocess_playback_base()
 
-        if os.path.exists(os.path.join(self.prepro_derived_folder, f'{self.hash_filter_parameters}.parquet')):
+        if os.path.exists(self.derived_path):
             print('Preprocessed derived data found.')
             dataframe = self._load_derived_playback()
             return dataframe
@@ -117,18 +298,21 @@ class Playback:
 
     def _create_derived_playback(self) -> pd.DataFrame:
         """Create the derived playback data based on the given parameters and return the derived dataframe."""
-        # TODO: Implement this. Collect then apply filters?
         start_time = perf_counter()
 
-        dataframe = self._load_source()
+        dataframe = self._load_source(self._plan_source_files())
 
         self._date_and_time_to_timestamp(dataframe)
 
         # Remove columns that are not needed for playback.
         dataframe = dataframe[self._get_columns()]
 
+        dataframe = self._derive_kinematics(dataframe)
+
         dataframe = self._apply_filters(dataframe)
 
+        dataframe = self._apply_derivations(dataframe)
+
         print(f'Preprocessed derived data finished at {datetime.now()} '
               f'in {timedelta(seconds=(perf_counter() - start_time))}')
 
@@ -154,9 +338,16 @@ class Playback:
 
         self._date_and_time_to_timestamp(dataframe)
 
+        # The kinematics are derived from the full track of each vessel before it is split into tiles, so reads of the
+        # base restricted to an extent or time interval still get the kinematics since each actual previous report.
+        dataframe = add_kinematics(dataframe)
+
+        dataframe['TILE'] = tile_keys(dataframe['LATITUDE'], dataframe['LONGITUDE'])
+        dataframe['HOUR'] = dataframe['TIMESTAMP'].dt.hour.astype('int8')
+
         print('Saving base file for preprocessed data...')
 
-        self._save_parquet(dataframe, os.path.join(self.prepro_base_folder, 'base.parquet'))
+        self._save_tiled_parquet(dataframe, os.path.join(self.prepro_base_folder, 'base.parquet'))
 
         print(f'Preprocessed base data finished at {datetime.now()} '
               f'in {timedelta(seconds=(perf_counter() - start_time))}')
@@ -172,20 +363,30 @@ class Playback:
         """Load the preprocessed data from the preprocessed data folder."""
         print(f'Loading derived data at {datetime.now()}')
 
-        dataframe = pd.read_parquet(os.path.join(self.prepro_derived_folder, f'{self.hash_filter_parameters}.parquet'))
+        if self.memory_map:
+            # Memory map the file, so the buffers are backed by the page cache shared with other processes.
+            # split_blocks avoids consolidating columns, which allows zero-copy conversion of numeric columns.
+            with pa.memory_map(self.derived_path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            dataframe = table.to_pandas(split_blocks=True)
+        else:
+            dataframe = pd.read_parquet(self.derived_path)
 
         return dataframe
 
     def _get_columns(self) -> list[str]:
         """Return a list of columns.
 
-        Used to limit the columns read from the source data or the preprocessed data.
+        Used to limit the columns read from the source data or the preprocessed data. Columns derived during
+        preprocessing, such as the kinematics of the extended player, are added afterwards.
         """
         if self.player == 'simple':
             return ['MMSI', 'IMO', 'NAV STATUS', 'SOG', 'LONGITUDE', 'LATITUDE', 'COG', 'HEADING', 'TIMESTAMP']
 
         if self.player == 'extended':
-            raise NotImplementedError('Extended player not implemented yet.')
+            return ['MMSI', 'IMO', 'CALLSIGN', 'SHIP NAME', 'SHIP TYPE', 'CARGO TYPE', 'WIDTH', 'LENGTH', 'DRAUGHT',
+                    'DESTINATION', 'ETA', 'NAV STATUS', 'SOG', 'ROT', 'LONGITUDE', 'LATITUDE', 'COG', 'HEADING',
+                    'TIMESTAMP']
 
     def _preprocess_playback_derived(self) -> pd.DataFrame:
         """Derive a subset of the preprocessed data based on the given parameters.
@@ -199,8 +400,12 @@ class Playback:
 
         dataframe = self._apply_filters(dataframe)
 
-        self._save_parquet(dataframe,
-                           os.path.join(self.prepro_derived_folder, f'{self.hash_filter_parameters}.parquet'))
+        dataframe = self._apply_derivations(dataframe)
+
+        if self.memory_map:
+            self._save_feather(dataframe, self.derived_path)
+        else:
+            self._save_parquet(dataframe, self.derived_path)
 
         print(f'Preprocessed derived data finished at {datetime.now()} in '
               f'in {timedelta(seconds=(perf_counter() - start_time))}')
@@ -211,16 +416,23 @@ class Playback:
         """Load the base preprocessed data from the preprocessed data folder."""
         print(f'Loading preprocessed base data at {datetime.now()}')
 
-        if self.player == 'extended':
-            raise NotImplementedError('Extended player not implemented yet.')
-
         base_playback_file = os.path.join(self.prepro_base_folder, 'base.parquet')
 
+        # Only the tiles and row groups overlapping the extent and time interval are read, the rows are pruned to the
+        # exact extent and time interval when filtering.
+        # The kinematics of the extended player are stored in the base data.
+        columns = self._get_columns() + (KINEMATIC_COLUMNS if self.player == 'extended' else [])
+
         dataframe = pd.read_parquet(base_playback_file,
-                                    columns=self._get_columns(),
+                                    columns=columns,
+                                    filters=self._base_filters()
                                     )
         # Changes the order of the columns for consistency.
-        dataframe = dataframe[self._get_columns()]
+        dataframe = dataframe[columns]
+
+        # The partitions are read one tile at a time, so the rows must be sorted by time again.
+        dataframe.sort_values(by=['TIMESTAMP'], inplace=True, kind='stable')
+        dataframe.reset_index(inplace=True, drop=True)
 
         print('Loading complete')
 
@@ -234,6 +446,43 @@ class Playback:
         """
         dataframe = self._prune_to_time_interval(dataframe)
 
+        if self.subset is not None:
+            dataframe = dataframe[dataframe['MMSI'].isin([int(mmsi) for mmsi in self.subset])]
+            dataframe = dataframe.reset_index(drop=True)
+
+        if self.extent is not None:
+            dataframe = dataframe[within_extent(dataframe, self.extent)].reset_index(drop=True)
+
+        return dataframe
+
+    def _derive_kinematics(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Add the kinematics of each vessel for the extended player and return the dataframe.
+
+        Must be called before filtering, so the kinematics are measured from each vessel's actual previous report
+        rather than from the previous report within the filters.
+
+        Args:
+            dataframe: The unfiltered dataframe, holding all reports of each vessel.
+        """
+        if self.player == 'extended':
+            print(f'Deriving vessel kinematics at {datetime.now()}')
+            dataframe = add_kinematics(dataframe)
+
+        return dataframe
+
+    def _apply_derivations(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Add the derived data to the given filtered dataframe and return the derived dataframe.
+
+        Args:
+            dataframe: The filtered dataframe to derive data from.
+        """
+        if self.interpolation is not None:
+            print(f'Interpolating vessel tracks ({self.interpolation}) at {datetime.now()}')
+            dataframe = interpolate_tracks(dataframe,
+                                           tick=self.interpolation_tick,
+                                           max_gap=self.max_gap,
+                                           method=self.interpolation)
+
         return dataframe
 
     def _prune_to_time_interval(self, dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -258,9 +507,125 @@ class Playback:
         """
         dataframe.to_parquet(path)
 
-    def _load_source(self) -> pd.DataFrame:
-        """Load the raw source data from the given files and return a concatenated dataframe."""
-        source_files = collect_files(self.source_path, 'csv')
+    def _base_filters(self) -> list[list[tuple]] | None:
+        """Return the filters used to only read the tiles and row groups of the base data within the filters.
+
+        The filters are in disjunctive normal form, as an interval wrapping around midnight covers two hour ranges.
+        Returns None if the whole base data must be read.
+        """
+        area = [('TILE', 'in', tiles_in_extent(self.extent))] if self.extent is not None else []
+
+        if not area and self.start_time == time.min and self.stop_time == time.max:
+            return None
+
+        if self.start_time <= self.stop_time:
+            return [area + [('HOUR', '>=', self.start_time.hour), ('HOUR', '<=', self.stop_time.hour)]]
+
+        return [area + [('HOUR', '>=', self.start_time.hour)], area + [('HOUR', '<=', self.stop_time.hour)]]
+
+    @staticmethod
+    def _save_tiled_parquet(dataframe: pd.DataFrame, path: str) -> None:
+        """Save the given dataframe as a parquet dataset partitioned by the TILE column.
+
+        Each tile is stored in its own folder with the rows in time order, split into row groups of at most
+        BASE_ROW_GROUP_SIZE rows. The row group statistics of the HOUR column then let reads restricted to a time
+        interval skip the row groups outside it, while reads restricted to an area only open the files of the
+        overlapping tiles.
+
+        The dataset is written to a temporary folder of this process which replaces the path once complete, so an
+        interrupted write never leaves a partial dataset at the path and concurrent playbacks never write to the same
+        folder. If another process has completed the dataset at the path in the meantime, its dataset is kept and the
+        temporary folder is removed. A base file saved before the data was partitioned is replaced.
+
+        Args:
+            dataframe: The dataframe to save. Must have TILE and HOUR columns.
+            path: The path of the folder to save the dataset to.
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+
+        # Left behind by an interrupted process that had the same process id.
+        if os.path.isdir(temporary_path):
+            shutil.rmtree(temporary_path)
+
+        dataframe = dataframe.sort_values(by=['TILE', 'TIMESTAMP'], kind='stable')
+        tiles = max(dataframe['TILE'].nunique(), 1)
+        # Writing without threads keeps the rows of each tile in time order, and as the rows are sorted by tile, a
+        # tile file closed to stay within the open file limit is never needed again.
+        dataframe.to_parquet(temporary_path, partition_cols=['TILE'], index=False,
+                             row_group_size=BASE_ROW_GROUP_SIZE, use_threads=False,
+                             max_partitions=tiles, max_open_files=min(tiles, BASE_MAX_OPEN_FILES))
+
+        Playback._replace_base(temporary_path, path)
+
+    @staticmethod
+    def _replace_base(temporary_path: str, path: str) -> None:
+        """Move a completely written base dataset from its temporary folder to the path.
+
+        Args:
+            temporary_path: The temporary folder the dataset was written to.
+            path: The path of the folder to move the dataset to.
+        """
+        if os.path.isfile(path):
+            os.remove(path)
+
+        try:
+            os.replace(temporary_path, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+            print(f'Keeping the base data saved by another process at {path}')
+            shutil.rmtree(temporary_path)
+
+    @staticmethod
+    def _save_feather(dataframe: pd.DataFrame, path: str) -> None:
+        """Save the given dataframe as an uncompressed feather file, which can be memory mapped when loaded.
+
+        The file is written to a temporary file and then renamed, so concurrent playbacks never map a partial file.
+
+        Args:
+            dataframe: The dataframe to save.
+            path: The path to save the dataframe to.
+        """
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        # A single record batch keeps each column in one chunk, else converting to pandas has to copy to join them.
+        dataframe.reset_index(drop=True).to_feather(temporary_path, compression='uncompressed',
+                                                    chunksize=max(dataframe.shape[0], 1))
+        os.replace(temporary_path, path)
+
+    def _plan_source_files(self) -> list[str]:
+        """Return the source files that may hold data within the filters.
+
+        Uses the catalog written by the splitter when the source path is a day folder with a catalog, so files
+        outside the time interval, subset or extent are skipped without being opened. Otherwise all source files are
+        returned.
+        """
+        catalog = read_catalog(self.source_path) if os.path.isdir(self.source_path) else None
+
+        if catalog is None:
+            return collect_files(self.source_path, 'csv')
+
+        source_files = plan_files(catalog, self.source_path,
+                                  start_time=self.start_time,
+                                  stop_time=self.stop_time,
+                                  mmsis=self.subset,
+                                  extent=self.extent)
+
+        print(f'Planned {len(source_files)} of {len(catalog)} source files from the catalog')
+
+        return source_files
+
+    def _load_source(self, source_files: list[str] | None = None) -> pd.DataFrame:
+        """Load the raw source data from the given files and return a concatenated dataframe.
+
+        Args:
+            source_files: The files to load. If None, all files in the source path are loaded. (default: None)
+        """
+        source_files = collect_files(self.source_path, 'csv') if source_files is None else source_files
+
+        if not source_files:
+            raise ValueError(f'No source files to load from {self.source_path} within the given filters.')
+
         number_of_files = len(source_files)
         dataframe_list = []
         start_time = perf_counter()
@@ -20,3 +20,10 @@ class PlaybackProcessor(ABC):
     @abstractmethod
     def end(self) -> None:
         """Execute once when playback ends."""
+
+    def result(self) -> object:
+        """Return the results collected during playback, called after end.
+
+        Used by sharded playback to gather the results of the processor in each worker. (default: None)
+        """
+        return None
@@ -0,0 +1,170 @@
+"""Module for playing back AIS data sharded by vessel across several worker processes sharing one emission clock."""
+from playback.processors.playback_processor import PlaybackProcessor
+from multiprocessing import Process, Queue
+from queue import Empty
+from time import sleep
+import numpy as np
+import pandas as pd
+import pickle
+import traceback
+
+REPLY_TIMEOUT = 1.0  # Seconds between checks of whether the workers are still alive while waiting for replies.
+
+
+def play_sharded(dataframe: pd.DataFrame,
+                 *,
+                 processor: PlaybackProcessor,
+                 shards: int,
+                 speed: int,
+                 no_sleep: bool
+                 ) -> list:
+    """Play back the dataframe with the vessels partitioned across worker processes and return the shard results.
+
+    Each worker gets a copy of the processor and the rows of its own vessels. The coordinator (the calling process)
+    determines the emission windows exactly as a non-sharded playback would, sends each window to every worker and
+    waits until all workers have processed it before moving on, so all workers share the same emission clock.
+
+    Args:
+        dataframe: The dataframe to play back.
+        processor: The processor to copy into each worker.
+        shards: The number of worker processes.
+        speed: The speed to play back the data, i.e. the number of seconds in each emission window.
+        no_sleep: If True, the playback will not sleep between emissions.
+
+    Returns:
+        The value returned by the result method of each worker's processor, ordered by shard.
+
+    Raises:
+        RuntimeError: If a worker raises an exception or exits without replying.
+    """
+    commands = [Queue() for _ in range(shards)]
+    replies = Queue()
+    workers = [Process(target=_run_shard, args=(shard, processor, shard_dataframe, commands[shard], replies))
+               for shard, shard_dataframe in enumerate(partition_by_vessel(dataframe, shards))]
+
+    for worker in workers:
+        worker.start()
+
+    try:
+        _emit_windows(dataframe, speed, no_sleep, commands, replies, workers)
+        results = _gather(replies, workers)
+    finally:
+        _stop_workers(workers, commands)
+
+    return [pickle.loads(results[shard]) for shard in range(shards)]
+
+
+def partition_by_vessel(dataframe: pd.DataFrame, shards: int) -> list[pd.DataFrame]:
+    """Partition the dataframe by a hash of the MMSI and return a list with the dataframe of each shard.
+
+    Args:
+        dataframe: The dataframe to partition.
+        shards: The number of partitions.
+    """
+    shard_keys = pd.util.hash_pandas_object(dataframe['MMSI'], index=False).to_numpy() % shards
+
+    return [dataframe[shard_keys == shard].sort_values(by=['TIMESTAMP'], kind='stable').reset_index(drop=True)
+            for shard in range(shards)]
+
+
+def _emission_windows(dataframe: pd.DataFrame, speed: int) -> list[tuple[np.datetime64, np.datetime64]]:
+    """Return the start and stop of each emission window, using the same grouping as a non-sharded playback."""
+    frequency = pd.Timedelta(seconds=speed)
+    window_starts = dataframe.groupby(pd.Grouper(key='TIMESTAMP', freq=f'{speed}S')).size().index
+
+    return [(start.to_datetime64(), (start + frequency).to_datetime64()) for start in window_starts]
+
+
+def _emit_windows(dataframe: pd.DataFrame,
+                  speed: int,
+                  no_sleep: bool,
+                  commands: list[Queue],
+                  replies: Queue,
+                  workers: list[Process]
+                  ) -> None:
+    """Send each emission window to every worker, waiting for all workers to process it before the next window."""
+    for window_start, window_stop in _emission_windows(dataframe, speed):
+        print(f'Emitting group: {window_start} at speed {speed}x to {len(workers)} shards')
+
+        for command in commands:
+            command.put((window_start, window_stop))
+        _gather(replies, workers)
+
+        sleep(1) if not no_sleep else None
+
+    for command in commands:
+        command.put(None)
+
+
+def _run_shard(shard: int,
+               processor: PlaybackProcessor,
+               dataframe: pd.DataFrame,
+               commands: Queue,
+               replies: Queue
+               ) -> None:
+    """Process the windows received from the coordinator for a single shard until told to stop.
+
+    Replies to the coordinator once per window, and finally with the pickled result of the processor. Exceptions,
+    including a result that cannot be pickled, are sent to the coordinator as an error reply instead.
+    """
+    try:
+        timestamps = dataframe['TIMESTAMP'].to_numpy(dtype='datetime64[ns]')
+
+        processor.begun()
+
+        for window in iter(commands.get, None):
+            start, stop = np.searchsorted(timestamps, window, side='left')
+
+            if stop > start:
+                processor.process(dataframe.iloc[start:stop].reset_index(drop=True))
+
+            replies.put((shard, 'processed', None))
+
+        processor.end()
+
+        replies.put((shard, 'result', pickle.dumps(processor.result())))
+    except Exception:
+        replies.put((shard, 'error', traceback.format_exc()))
+
+
+def _gather(replies: Queue, workers: list[Process]) -> dict[int, object]:
+    """Wait for a reply from every shard and return the reply payloads by shard.
+
+    Raises:
+        RuntimeError: If a shard replies with an error, or a worker exits before replying.
+    """
+    gathered = {}
+
+    while len(gathered) < len(workers):
+        try:
+            shard, kind, payload = replies.get(timeout=REPLY_TIMEOUT)
+        except Empty:
+            _check_alive(workers, gathered)
+            continue
+
+        if kind == 'error':
+            raise RuntimeError(f'Shard {shard} failed during playback:\n{payload}')
+
+        gathered[shard] = payload
+
+    return gathered
+
+
+def _check_alive(workers: list[Process], gathered: dict[int, object]) -> None:
+    """Raise an error if a worker that has not replied yet has exited, as its reply will never arrive."""
+    for shard, worker in enumerate(workers):
+        if shard not in gathered and not worker.is_alive():
+            raise RuntimeError(f'Shard {shard} exited with code {worker.exitcode} without replying.')
+
+
+def _stop_workers(workers: list[Process], commands: list[Queue]) -> None:
+    """Tell the workers to stop, wait for them to exit, and terminate any that are still running."""
+    for worker, command in zip(workers, commands):
+        if worker.is_alive():
+            command.put(None)
+
+    for worker in workers:
+        worker.join(timeout=5)
+
+        if worker.is_alive():
+            worker.terminate()
@@ -0,0 +1,214 @@
+"""Module for tailing a growing source of split AIS data and emitting event time windows once they are complete."""
+from helper_functions import collect_files
+from datetime import timedelta
+import pandas as pd
+import io
+import os
+
+LATE_POLICIES = ('drop', 'emit', 'next')
+
+
+class SourceTail:
+    """Incrementally reads the rows appended to the csv files of a source path since the previous read.
+
+    Files are identified by device and inode rather than by name, so a renamed (rotated) file is not read again.
+    A file that shrinks is assumed to be truncated or replaced and is read again from the start, and a file that
+    disappears between listing and reading (e.g. rotated away) is skipped, as is a source path that does not exist.
+    Only complete lines are read, a partially written last line is read once it is terminated.
+    """
+
+    def __init__(self, source_path: str) -> None:
+        """Initialise the tail.
+
+        Args:
+            source_path: The path to a split file or a folder of split files to tail.
+        """
+        self.source_path = source_path
+        self.offsets = {}
+        self.headers = {}
+
+    def read_new(self) -> pd.DataFrame | None:
+        """Read the rows appended since the previous read and return them as a dataframe, or None if there are none."""
+        seen = set()
+        dataframes = [self._read_appended(file, seen) for file in self._list_files()]
+        dataframes = [dataframe for dataframe in dataframes if dataframe is not None]
+
+        # Forget files that are gone, so a reused inode is not read from a stale offset with a stale header.
+        for key in set(self.offsets) - seen:
+            self.offsets.pop(key)
+            self.headers.pop(key, None)
+
+        return pd.concat(dataframes, ignore_index=True) if dataframes else None
+
+    def _list_files(self) -> list[str]:
+        """Return the csv files of the source path, or an empty list if the source path does not exist right now."""
+        try:
+            return collect_files(self.source_path, 'csv')
+        except (ValueError, FileNotFoundError):
+            # The source path is a single file that has been rotated away, or a folder that has been removed, and no
+            # new rows arrive until it is back.
+            return []
+
+    def _read_appended(self, file: str, seen: set[tuple[int, int]]) -> pd.DataFrame | None:
+        """Read the complete lines appended to a file since the previous read and return them as a dataframe.
+
+        Args:
+            file: The path to the file.
+            seen: The keys of the files read in this poll, which the key of the file is added to.
+        """
+        read = self._read_chunk(file)
+
+        if read is None:
+            return None
+
+        key, offset, chunk = read
+        seen.add(key)
+
+        if offset == 0:
+            self.headers.pop(key, None)
+
+        complete = chunk.rfind(b'\n') + 1
+        self.offsets[key] = offset + complete
+        text = chunk[:complete].decode('utf-8')
+
+        if key not in self.headers and text:
+            self.headers[key], _, text = text.partition('\n')
+
+        if not text:
+            return None
+
+        return pd.read_csv(io.StringIO(self.headers[key] + '\n' + text), encoding='utf-8', sep='|',
+                           dtype={'CALLSIGN': 'string'})
+
+    def _read_chunk(self, file: str) -> tuple[tuple[int, int], int, bytes] | None:
+        """Read a file from its offset and return its key, the offset and the bytes read, or None if it is gone.
+
+        The file is opened before it is stat-ed, so the size and key belong to the file that is actually read.
+        """
+        try:
+            with open(file, 'rb') as source:
+                status = os.fstat(source.fileno())
+                key = (status.st_dev, status.st_ino)
+                offset = self._offset(key, status.st_size)
+                source.seek(offset)
+
+                return key, offset, source.read(status.st_size - offset)
+        except FileNotFoundError:
+            return None
+
+    def _offset(self, key: tuple[int, int], size: int) -> int:
+        """Return the offset to read a file from, which is the start of the file if it has shrunk since last read."""
+        offset = self.offsets.get(key, 0)
+
+        return offset if size >= offset else 0
+
+
+class WatermarkWindows:
+    """Buffers rows into fixed event time windows and releases each window once the watermark has passed its end.
+
+    The watermark is the latest event time seen minus the watermark delay, so rows arriving up to the delay out of
+    order still end up in their own window. The latest event time can be given separately from the rows, so rows
+    removed by filters still move the watermark forward. Rows arriving for a window that has already been emitted are
+    late, and are handled by the late policy:
+    * 'drop': Late rows are discarded.
+    * 'emit': Late rows are emitted immediately as their own emission.
+    * 'next': Late rows are included in the next emitted window, or emitted on their own when flushed.
+    """
+
+    def __init__(self, *, window: timedelta, watermark_delay: timedelta, late_policy: str) -> None:
+        """Initialise the windows.
+
+        Args:
+            window: The length of each window.
+            watermark_delay: How far the watermark trails the latest event time seen.
+            late_policy: How to handle late rows, one of 'drop', 'emit' or 'next'.
+        """
+        if late_policy not in LATE_POLICIES:
+            raise ValueError(f'Late policy must be one of {LATE_POLICIES}.')
+
+        self.window = pd.Timedelta(window)
+        self.watermark_delay = pd.Timedelta(watermark_delay)
+        self.late_policy = late_policy
+        self.pending = None
+        self.carried = None
+        self.latest = None
+        self.emitted_until = None
+        self.late_rows = 0
+
+    def add(self,
+            dataframe: pd.DataFrame,
+            latest: pd.Timestamp | None = None
+            ) -> list[tuple[pd.Timestamp, pd.DataFrame]]:
+        """Add new rows and return the emissions that are complete, as pairs of window start and rows.
+
+        Args:
+            dataframe: The new rows, with a TIMESTAMP column.
+            latest: The latest event time ingested along with the rows, including rows that were filtered away.
+                If None, the latest timestamp of the rows is used. (default: None)
+        """
+        latest = dataframe['TIMESTAMP'].max() if latest is None else latest
+
+        if pd.isna(latest):
+            return []
+
+        self.latest = latest if self.latest is None else max(self.latest, latest)
+
+        late = dataframe['TIMESTAMP'] < self.emitted_until if self.emitted_until is not None \
+            else pd.Series(False, index=dataframe.index)
+
+        emissions = self._handle_late(dataframe[late])
+        self.pending = pd.concat([self.pending, dataframe[~late]], ignore_index=True)
+
+        return emissions + self._emit_until(self.latest - self.watermark_delay)
+
+    def flush(self) -> list[tuple[pd.Timestamp, pd.DataFrame]]:
+        """Return the emissions of all remaining windows and late rows, regardless of the watermark."""
+        emissions = []
+
+        if self.pending is not None and not self.pending.empty:
+            emissions = self._emit_until(self.pending['TIMESTAMP'].max() + self.window)
+
+        # Late rows carried to the next window, when no window is left to carry them.
+        if self.carried is not None:
+            emissions.append((self.carried['TIMESTAMP'].min(),
+                              self.carried.sort_values(by=['TIMESTAMP']).reset_index(drop=True)))
+            self.carried = None
+
+        return emissions
+
+    def _handle_late(self, late: pd.DataFrame) -> list[tuple[pd.Timestamp, pd.DataFrame]]:
+        """Handle late rows according to the late policy and return any emissions of them."""
+        if late.empty:
+            return []
+
+        self.late_rows += late.shape[0]
+        print(f'Received {late.shape[0]} late rows, handled by policy: {self.late_policy}')
+
+        if self.late_policy == 'emit':
+            return [(late['TIMESTAMP'].min(), late.sort_values(by=['TIMESTAMP']).reset_index(drop=True))]
+
+        if self.late_policy == 'next':
+            self.carried = pd.concat([self.carried, late], ignore_index=True)
+
+        return []
+
+    def _emit_until(self, watermark: pd.Timestamp) -> list[tuple[pd.Timestamp, pd.DataFrame]]:
+        """Remove the windows ending at or before the watermark from the pending rows and return their emissions."""
+        window_starts = self.pending['TIMESTAMP'].dt.floor(self.window)
+        ready = window_starts + self.window <= watermark
+        self.emitted_until = watermark.floor(self.window) if self.emitted_until is None \
+            else max(self.emitted_until, watermark.floor(self.window))
+
+        if not ready.any():
+            return []
+
+        emissions = [(start, group.sort_values(by=['TIMESTAMP']).reset_index(drop=True))
+                     for start, group in self.pending[ready].groupby(window_starts[ready])]
+        self.pending = self.pending[~ready].reset_index(drop=True)
+
+        if self.carried is not None:
+            start, first = emissions[0]
+            emissions[0] = (start, pd.concat([self.carried, first], ignore_index=True))
+            self.carried = None
+
+        return emissions
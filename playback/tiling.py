@@ -0,0 +1,64 @@
+"""Module for assigning AIS data to tiles of a fixed global grid, used to restrict reads to a geographical extent.
+
+Tiles are numbered row by row from the south-west corner (-90, -180), so a tile key is a single integer.
+"""
+import numpy as np
+import pandas as pd
+
+TILE_SIZE = 0.5  # Degrees of latitude and longitude covered by each tile.
+
+
+def tile_keys(latitude: pd.Series, longitude: pd.Series, tile_size: float = TILE_SIZE) -> np.ndarray:
+    """Return the tile key of each position.
+
+    Args:
+        latitude: The latitudes of the positions.
+        longitude: The longitudes of the positions.
+        tile_size: The size of each tile in degrees. (default: TILE_SIZE)
+    """
+    rows = _tile_index(latitude.to_numpy(dtype='float64'), -90, 180, tile_size)
+    columns = _tile_index(longitude.to_numpy(dtype='float64'), -180, 360, tile_size)
+
+    return rows * _number_of_columns(tile_size) + columns
+
+
+def tiles_in_extent(extent: tuple[float, float, float, float], tile_size: float = TILE_SIZE) -> list[int]:
+    """Return the keys of all tiles overlapping the extent.
+
+    Args:
+        extent: The extent as (min longitude, max longitude, min latitude, max latitude), as used by MapPlotter.
+        tile_size: The size of each tile in degrees. (default: TILE_SIZE)
+    """
+    longitude_min, longitude_max, latitude_min, latitude_max = extent
+
+    rows = _tile_index(np.array([latitude_min, latitude_max]), -90, 180, tile_size)
+    columns = _tile_index(np.array([longitude_min, longitude_max]), -180, 360, tile_size)
+
+    row_grid, column_grid = np.meshgrid(np.arange(rows[0], rows[1] + 1), np.arange(columns[0], columns[1] + 1))
+
+    return (row_grid * _number_of_columns(tile_size) + column_grid).ravel().tolist()
+
+
+def within_extent(dataframe: pd.DataFrame, extent: tuple[float, float, float, float]) -> pd.Series:
+    """Return a boolean series telling which rows of the dataframe have a position within the extent.
+
+    Args:
+        dataframe: The dataframe with LATITUDE and LONGITUDE columns.
+        extent: The extent as (min longitude, max longitude, min latitude, max latitude).
+    """
+    longitude_min, longitude_max, latitude_min, latitude_max = extent
+
+    return dataframe['LONGITUDE'].between(longitude_min, longitude_max) & \
+        dataframe['LATITUDE'].between(latitude_min, latitude_max)
+
+
+def _tile_index(values: np.ndarray, origin: float, span: float, tile_size: float) -> np.ndarray:
+    """Return the index of the tile along one axis for each value, clipped to the grid."""
+    maximum_index = int(np.ceil(span / tile_size)) - 1
+
+    return np.clip(np.floor((values - origin) / tile_size), 0, maximum_index).astype('int64')
+
+
+def _number_of_columns(tile_size: float) -> int:
+    """Return the number of tiles along the longitude axis."""
+    return int(np.ceil(360 / tile_size))
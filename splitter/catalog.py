@@ -0,0 +1,130 @@
+"""Module for the catalog of split files, describing each vessel file so reads can be planned without opening them.
+
+The catalog is stored as a parquet file in each day folder, with one row per vessel file.
+"""
+from datetime import time
+from helper_functions import combine_date_and_time
+from splitter.journal import write_atomically
+import pandas as pd
+import os
+
+CATALOG_FILE_NAME = 'catalog.parquet'
+
+
+def build_catalog(dataframe_day: pd.DataFrame, day_folder: str) -> pd.DataFrame:
+    """Build the catalog for the vessel files of a single day and return it as a dataframe.
+
+    The vessel files must already be written to the day folder, as their size is read from disk.
+
+    Args:
+        dataframe_day: The split data for a single day, with DATE and TIME columns.
+        day_folder: The folder the vessel files of the day were written to.
+    """
+    timestamps = combine_date_and_time(dataframe_day['DATE'], dataframe_day['TIME'])
+    ship_types = dataframe_day['SHIP TYPE'] if 'SHIP TYPE' in dataframe_day.columns else pd.NA
+
+    statistics = pd.DataFrame({
+        'MMSI': dataframe_day['MMSI'].astype('int64'),
+        'TIMESTAMP': timestamps,
+        'LATITUDE': dataframe_day['LATITUDE'],
+        'LONGITUDE': dataframe_day['LONGITUDE'],
+        'SHIP TYPE': ship_types
+    })
+
+    catalog = statistics.groupby('MMSI').agg(**{
+        'ROWS': ('TIMESTAMP', 'size'),
+        'MIN TIMESTAMP': ('TIMESTAMP', 'min'),
+        'MAX TIMESTAMP': ('TIMESTAMP', 'max'),
+        'MIN LATITUDE': ('LATITUDE', 'min'),
+        'MAX LATITUDE': ('LATITUDE', 'max'),
+        'MIN LONGITUDE': ('LONGITUDE', 'min'),
+        'MAX LONGITUDE': ('LONGITUDE', 'max'),
+        'SHIP TYPE': ('SHIP TYPE', 'first')
+    }).reset_index()
+
+    catalog.insert(0, 'FILE', catalog['MMSI'].astype(str) + '.csv')
+    catalog['SHIP TYPE'] = catalog['SHIP TYPE'].astype('string')
+    catalog['BYTES'] = [os.path.getsize(os.path.join(day_folder, file)) for file in catalog['FILE']]
+
+    return catalog
+
+
+def write_catalog(catalog: pd.DataFrame, day_folder: str) -> None:
+    """Write the catalog to the day folder, replacing the entries of any vessel files already in the catalog.
+
+    Args:
+        catalog: The catalog to write.
+        day_folder: The day folder to write the catalog to.
+    """
+    existing = read_catalog(day_folder)
+
+    if existing is not None:
+        existing = existing[~existing['FILE'].isin(catalog['FILE'])]
+        catalog = pd.concat([existing, catalog], ignore_index=True)
+
+    catalog.sort_values(by=['MMSI'], inplace=True)
+    write_atomically(os.path.join(day_folder, CATALOG_FILE_NAME), lambda path: catalog.to_parquet(path, index=False))
+
+
+def read_catalog(day_folder: str) -> pd.DataFrame | None:
+    """Read the catalog of a day folder and return it as a dataframe, or None if the folder has no catalog.
+
+    Args:
+        day_folder: The day folder to read the catalog from.
+    """
+    catalog_path = os.path.join(day_folder, CATALOG_FILE_NAME)
+
+    if not os.path.isfile(catalog_path):
+        return None
+
+    return pd.read_parquet(catalog_path)
+
+
+def plan_files(catalog: pd.DataFrame,
+               day_folder: str,
+               *,
+               start_time: time = time.min,
+               stop_time: time = time.max,
+               mmsis: list[str | int] | None = None,
+               extent: tuple[float, float, float, float] | None = None
+               ) -> list[str]:
+    """Return the paths of the vessel files in the catalog that may hold data within the given filters.
+
+    Args:
+        catalog: The catalog of the day folder.
+        day_folder: The day folder the catalog describes.
+        start_time: The start of the time interval. If later than stop_time, the interval wraps around midnight.
+            (default: 00:00:00)
+        stop_time: The stop of the time interval. (default: 23:59:59)
+        mmsis: The vessels to include. If None, all vessels are included. (default: None)
+        extent: The area as (min longitude, max longitude, min latitude, max latitude). Files whose bounding box
+            does not overlap the area are left out. If None, all areas are included. (default: None)
+    """
+    keep = _overlaps_time_interval(catalog, start_time, stop_time)
+
+    if mmsis is not None:
+        keep &= catalog['MMSI'].isin([int(mmsi) for mmsi in mmsis])
+
+    if extent is not None:
+        keep &= _overlaps_extent(catalog, extent)
+
+    return [os.path.join(day_folder, file) for file in catalog.loc[keep, 'FILE']]
+
+
+def _overlaps_time_interval(catalog: pd.DataFrame, start_time: time, stop_time: time) -> pd.Series:
+    """Return a boolean series telling which files in the catalog overlap the time of day interval."""
+    first_time = catalog['MIN TIMESTAMP'].dt.time
+    last_time = catalog['MAX TIMESTAMP'].dt.time
+
+    if start_time <= stop_time:
+        return (last_time >= start_time) & (first_time <= stop_time)
+
+    return (last_time >= start_time) | (first_time <= stop_time)
+
+
+def _overlaps_extent(catalog: pd.DataFrame, extent: tuple[float, float, float, float]) -> pd.Series:
+    """Return a boolean series telling which files in the catalog have a bounding box overlapping the extent."""
+    longitude_min, longitude_max, latitude_min, latitude_max = extent
+
+    return (catalog['MAX LONGITUDE'] >= longitude_min) & (catalog['MIN LONGITUDE'] <= longitude_max) & \
+        (catalog['MAX LATITUDE'] >= latitude_min) & (catalog['MIN LATITUDE'] <= latitude_max)
@@ -0,0 +1,152 @@
+"""Module for the journal of a split job, recording finished work so an interrupted split can be resumed."""
+from typing import Callable
+import json
+import os
+
+JOURNAL_FILE_NAME = 'split_journal.jsonl'
+TEMPORARY_SUFFIX = '.tmp'
+
+
+class SplitJournal:
+    """Journal of the source files a split job has finished, and the output partitions written for each of them.
+
+    The journal is stored as a JSON line per finished source file in the target folder. Lines are appended and
+    flushed to disk once a source file is completely split, so a crash can at most lose the source file being split.
+    Each entry records the options the file was split with, so a source file split with other options is split again.
+    """
+
+    def __init__(self, *, target_path: str, resume: bool, options: dict[str, object]) -> None:
+        """Initialise the journal, either continuing the existing journal or starting a new one.
+
+        Args:
+            target_path: The target folder of the split job, where the journal is stored.
+            resume: If True, the finished source files are read from an existing journal. If False, any existing
+                journal is discarded.
+            options: The options of the split job. Values are stored as strings, so they can be compared with the
+                options of the job that wrote the journal.
+        """
+        self.path = os.path.join(target_path, JOURNAL_FILE_NAME)
+        self.options = {name: None if value is None else str(value) for name, value in options.items()}
+        self.finished = {}
+
+        if resume:
+            self.finished = self._read()
+        elif os.path.isfile(self.path):
+            os.remove(self.path)
+
+    def is_finished(self, source_file: str) -> bool:
+        """Return True if the source file has been split with the same options, and has not changed since.
+
+        Args:
+            source_file: The path to the source file.
+        """
+        entry = self.finished.get(os.path.abspath(source_file))
+
+        return entry is not None and \
+            entry['signature'] == self._signature(source_file) and \
+            entry.get('options') == self.options
+
+    def record(self, source_file: str, partitions: list[str]) -> None:
+        """Record that the source file has been split into the given partitions.
+
+        Args:
+            source_file: The path to the source file.
+            partitions: The paths of the output files written for the source file, relative to the target folder.
+        """
+        target_path = os.path.dirname(self.path)
+
+        # The entry vouches for the partitions, so the renames of the partitions in their day folders, and the day
+        # folders in the target folder, must be on disk before the entry is.
+        for folder in sorted({os.path.dirname(os.path.join(target_path, partition)) for partition in partitions}):
+            sync_folder(folder)
+        sync_folder(target_path)
+
+        entry = {
+            'source': os.path.abspath(source_file),
+            'signature': self._signature(source_file),
+            'options': self.options,
+            'partitions': partitions
+        }
+
+        with open(self.path, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(entry) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        self.finished[entry['source']] = entry
+
+    def _read(self) -> dict[str, dict]:
+        """Read the journal and return the entries by source file. A partially written last line is ignored."""
+        finished = {}
+
+        if not os.path.isfile(self.path):
+            return finished
+
+        with open(self.path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                finished[entry['source']] = entry
+
+        return finished
+
+    @staticmethod
+    def _signature(source_file: str) -> list[int]:
+        """Return the size and modification time of the source file, used to detect changed source files."""
+        status = os.stat(source_file)
+
+        return [status.st_size, status.st_mtime_ns]
+
+
+def write_atomically(path: str, write: Callable[[str], None]) -> None:
+    """Write a file by calling write with a temporary path, then renaming the temporary file to the given path.
+
+    The rename is atomic, so the file at the path is either the previous or the complete new version, never a
+    partially written file. The temporary file is flushed to disk before the rename, so a crash of the machine cannot
+    leave an empty or partial file behind the rename either. The rename itself is on disk once the folder is synced,
+    see sync_folder.
+
+    Args:
+        path: The path of the file to write.
+        write: A function writing the file to the path it is given.
+    """
+    temporary_path = path + TEMPORARY_SUFFIX
+    write(temporary_path)
+
+    with open(temporary_path, 'rb') as temporary_file:
+        os.fsync(temporary_file.fileno())
+
+    os.replace(temporary_path, path)
+
+
+def sync_folder(folder: str) -> None:
+    """Flush the entries of a folder to disk, so files created or renamed in it survive a crash of the machine.
+
+    Does nothing on platforms where folders cannot be opened, such as Windows.
+
+    Args:
+        folder: The folder to flush.
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+
+    descriptor = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def remove_temporary_files(target_path: str) -> None:
+    """Remove temporary files left behind by an interrupted split job in the day folders of the target folder.
+
+    Args:
+        target_path: The target folder of the split job.
+    """
+    for folder, _, files in os.walk(target_path):
+        for file in files:
+            if file.endswith(TEMPORARY_SUFFIX):
+                os.remove(os.path.join(folder, file))
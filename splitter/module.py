@@ -1,8 +1,11 @@
 """Module for splitting AIS data into files by vessel by day."""
+import numpy as np
 import pandas as pd
 import os
-from helper_functions import collect_files
+from helper_functions import collect_files, combine_date_and_time
 from splitter.readers.source_reader import SourceReader
+from splitter.catalog import build_catalog, write_catalog
+from splitter.journal import SplitJournal, write_atomically, remove_temporary_files
 from datetime import datetime, timedelta
 from time import perf_counter
 
@@ -23,7 +26,10 @@ class Splitter:
               *,
               source_path: str,
               target_path: str = None,
-              prune_to_date: datetime.date = None
+              prune_to_date: datetime.date = None,
+              deduplicate: bool = False,
+              downsample_interval: timedelta | None = None,
+              resume: bool = False
               ) -> None:
         """Split the AIS data.
 
@@ -34,12 +40,32 @@ class Splitter:
             target_path: The path to the target folder. Will be created if it does not exist.
                 If None, the target path given in the constructor will be used. (default: None)
             prune_to_date: The date to prune the data to. If None, all data will be split. (default: None)
+            deduplicate: If True, exact and near duplicate reports on MMSI, timestamp and position are removed, e.g.
+                the same message received by several base stations. (default: False)
+            downsample_interval: The minimum interval between two reports from the same vessel. Reports arriving
+                more often are dropped. If None, no downsampling is done. (default: None)
+            resume: If True, source files recorded as finished in the journal of the target folder are skipped,
+                so an interrupted split continues where it stopped. Source files that were split with other values
+                for prune_to_date, deduplicate or downsample_interval are split again. If False, a new journal is
+                started.
+                (default: False)
         """
         target_path = self.target_path if target_path is None else target_path
         start_time = perf_counter()
 
         print(f'Splitting AIS data from source path: {source_path} -- to -> target path: {target_path}')
 
+        if not os.path.exists(target_path):
+            os.makedirs(target_path)
+
+        # Output files are written to temporary files and renamed when complete, leftovers are from a crash.
+        remove_temporary_files(target_path)
+        journal = SplitJournal(target_path=target_path, resume=resume, options={
+            'prune_to_date': prune_to_date,
+            'deduplicate': deduplicate,
+            'downsample_interval': downsample_interval
+        })
+
         files = collect_files(source_path, '.csv')
         current_file_number = 0
         number_of_files = len(files)
@@ -49,48 +75,99 @@ class Splitter:
         for file in files:
             current_file_number += 1
 
+            if journal.is_finished(file):
+                print(f'Skipping file {current_file_number} of {number_of_files}: {file}, already split')
+                continue
+
             print(f'Attempting to split file {current_file_number} of {number_of_files}: {file} at {datetime.now()}')
 
-            dataframe = self._read_file(file)
+            partitions = self._split_file(file, target_path, prune_to_date, deduplicate, downsample_interval)
 
-            size_before = dataframe.shape[0]
+            journal.record(file, partitions)
 
-            dataframe.sort_values(by=['DATE', 'TIME'], inplace=True, ascending=True)
+            print(f'File {file} split successfully at {datetime.now()} '
+                  f'in {timedelta(seconds=(perf_counter() - start_time))}')
 
-            dataframe.dropna(subset=[
-                'DATE',
-                'TIME',
-                'MMSI',
-                'LATITUDE',
-                'LONGITUDE'
-            ], inplace=True)
+    def _split_file(self,
+                    file: str,
+                    target_path: str,
+                    prune_to_date: datetime.date,
+                    deduplicate: bool,
+                    downsample_interval: timedelta | None
+                    ) -> list[str]:
+        """Split a single source file and return the paths of the written files relative to the target path.
 
-            size_after = dataframe.shape[0]
+        Args:
+            file: The path to the source file.
+            target_path: The path to the target folder.
+            prune_to_date: The date to prune the data to, or None.
+            deduplicate: Whether to remove exact and near duplicate reports.
+            downsample_interval: The minimum interval between two reports from the same vessel, or None.
+        """
+        dataframe = self._read_file(file)
 
-            print(f'Dropped {size_before - size_after} rows with missing values for MMSI, timestamp, lat or long')
+        size_before = dataframe.shape[0]
 
-            # Prune to date
-            if prune_to_date is not None:
-                dataframe = dataframe[dataframe['DATE'] == prune_to_date]
+        dataframe.sort_values(by=['DATE', 'TIME'], inplace=True, ascending=True)
 
-            for dataframe_day in self._split_by_day(dataframe):
-                date = dataframe_day['DATE'].iloc[0]
+        dataframe.dropna(subset=[
+            'DATE',
+            'TIME',
+            'MMSI',
+            'LATITUDE',
+            'LONGITUDE'
+        ], inplace=True)
 
-                if not os.path.exists(os.path.join(target_path, str(date))):
-                    os.makedirs(os.path.join(target_path, str(date)))
+        size_after = dataframe.shape[0]
 
-                for dataframe_vessel in self._split_by_vessel(dataframe_day):
-                    mmsi = int(dataframe_vessel['MMSI'].iloc[0])
+        print(f'Dropped {size_before - size_after} rows with missing values for MMSI, timestamp, lat or long')
 
-                    dataframe_vessel.to_csv(
-                        os.path.join(target_path, str(date), str(mmsi) + '.csv'),
-                        index=False,
-                        sep='|',
-                        encoding='utf-8',
-                        header=True)
+        dataframe = self._reduce(dataframe, deduplicate, downsample_interval)
 
-            print(f'File {file} split successfully at {datetime.now()} '
-                  f'in {timedelta(seconds=(perf_counter() - start_time))}')
+        # Prune to date
+        if prune_to_date is not None:
+            dataframe = dataframe[dataframe['DATE'] == prune_to_date]
+
+        partitions = []
+
+        for dataframe_day in self._split_by_day(dataframe):
+            partitions.extend(self._write_day(dataframe_day, target_path))
+
+        return partitions
+
+    def _write_day(self, dataframe_day: pd.DataFrame, target_path: str) -> list[str]:
+        """Write the data of a single day to a file per vessel in the day folder, and update the catalog of the day.
+
+        Each file is written to a temporary file and renamed when complete, so an interrupted split never leaves
+        partially written files behind. Returns the paths of the vessel files relative to the target path.
+
+        Args:
+            dataframe_day: The data for a single day.
+            target_path: The path to the target folder, in which the day folder is created.
+        """
+        day_folder = os.path.join(target_path, str(dataframe_day['DATE'].iloc[0]))
+
+        if not os.path.exists(day_folder):
+            os.makedirs(day_folder)
+
+        partitions = []
+
+        for dataframe_vessel in self._split_by_vessel(dataframe_day):
+            mmsi = int(dataframe_vessel['MMSI'].iloc[0])
+            vessel_file = os.path.join(day_folder, str(mmsi) + '.csv')
+
+            write_atomically(vessel_file, lambda path: dataframe_vessel.to_csv(
+                path,
+                index=False,
+                sep='|',
+                encoding='utf-8',
+                header=True))
+
+            partitions.append(os.path.relpath(vessel_file, target_path))
+
+        write_catalog(build_catalog(dataframe_day, day_folder), day_folder)
+
+        return partitions
 
     def _read_file(self, file_name: str) -> pd.DataFrame:
         """Read a file and return a pandas dataframe.
@@ -109,6 +186,102 @@ class Splitter:
 
         return dataframe
 
+    def _reduce(self,
+                dataframe: pd.DataFrame,
+                deduplicate: bool,
+                downsample_interval: timedelta | None
+                ) -> pd.DataFrame:
+        """Apply the optional deduplication and downsampling stages and return the reduced dataframe.
+
+        Args:
+            dataframe: The dataframe to reduce.
+            deduplicate: Whether to remove exact and near duplicate reports.
+            downsample_interval: The minimum interval between two reports from the same vessel, or None.
+        """
+        size_before = dataframe.shape[0]
+
+        if deduplicate:
+            dataframe = self._remove_duplicates(dataframe)
+
+        if downsample_interval is not None:
+            dataframe = self._downsample(dataframe, downsample_interval)
+
+        if deduplicate or downsample_interval is not None:
+            print(f'Reduced data by {size_before - dataframe.shape[0]} rows of {size_before} '
+                  f'by deduplication and downsampling')
+
+        return dataframe
+
+    @staticmethod
+    def _remove_duplicates(dataframe: pd.DataFrame, tolerance: float = 1e-5) -> pd.DataFrame:
+        """Remove exact and near duplicate reports and return the deduplicated dataframe.
+
+        A report is a duplicate if an earlier report shares its MMSI, date and time, and both its latitude and
+        longitude differ from that report by at most the tolerance (1e-5 degrees is roughly 1 meter).
+
+        Args:
+            dataframe: The dataframe to deduplicate.
+            tolerance: The largest difference in degrees between two positions considered the same. (default: 1e-5)
+        """
+        keys = pd.DataFrame({
+            'MMSI': dataframe['MMSI'].to_numpy(),
+            'DATE': dataframe['DATE'].to_numpy(),
+            'TIME': dataframe['TIME'].to_numpy(),
+            'LATITUDE': dataframe['LATITUDE'].to_numpy(),
+            'LONGITUDE': dataframe['LONGITUDE'].to_numpy(),
+            'ROW': np.arange(dataframe.shape[0])
+        })
+
+        # Only reports sharing MMSI, date and time with another report can be duplicates, so only those are paired.
+        keys = keys[keys.duplicated(subset=['MMSI', 'DATE', 'TIME'], keep=False)]
+        pairs = keys.merge(keys, on=['MMSI', 'DATE', 'TIME'], suffixes=('', ' EARLIER'))
+        pairs = pairs[pairs['ROW EARLIER'] < pairs['ROW']]
+
+        near = ((pairs['LATITUDE'] - pairs['LATITUDE EARLIER']).abs() <= tolerance) & \
+            ((pairs['LONGITUDE'] - pairs['LONGITUDE EARLIER']).abs() <= tolerance)
+
+        duplicate = np.zeros(dataframe.shape[0], dtype=bool)
+        duplicate[pairs.loc[near, 'ROW'].to_numpy()] = True
+
+        return dataframe[~duplicate]
+
+    @staticmethod
+    def _downsample(dataframe: pd.DataFrame, interval: timedelta) -> pd.DataFrame:
+        """Downsample each vessel so consecutive kept reports are at least the interval apart.
+
+        The first report of each vessel is kept, followed by the first report at least the interval after the
+        previous kept report, and so on. The next candidate of every report is found at once with a binary search,
+        so the only sequential work is a jump per kept report.
+
+        Args:
+            dataframe: The dataframe to downsample.
+            interval: The minimum interval between two kept reports from the same vessel.
+        """
+        if dataframe.empty:
+            return dataframe
+
+        timestamps = combine_date_and_time(dataframe['DATE'], dataframe['TIME'])
+        milliseconds = ((timestamps - timestamps.min()) // pd.Timedelta(milliseconds=1)).to_numpy(dtype='int64')
+        interval_milliseconds = max(pd.Timedelta(interval) // pd.Timedelta(milliseconds=1), 1)
+        vessels = pd.factorize(dataframe['MMSI'])[0]
+
+        # Sort by vessel then time, and offset each vessel's times so a search never crosses into the next vessel.
+        order = np.lexsort((milliseconds, vessels))
+        span = int(milliseconds.max()) + interval_milliseconds + 1
+        keys = vessels[order].astype('int64') * span + milliseconds[order]
+        candidates = np.searchsorted(keys, keys + interval_milliseconds, side='left')
+
+        keep_sorted = np.zeros(len(keys), dtype=bool)
+        position = 0
+        while position < len(keys):
+            keep_sorted[position] = True
+            position = candidates[position]
+
+        keep = np.empty(len(keys), dtype=bool)
+        keep[order] = keep_sorted
+
+        return dataframe[keep]
+
     @staticmethod
     def _split_by_day(dataframe: pd.DataFrame) -> list[pd.DataFrame]:
         """Split a dataframe by day and return a list of dataframes.
@@ -1,4 +1,5 @@
 import os
 
 # Constants
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'data')
 TEMP_DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'data', 'temp')
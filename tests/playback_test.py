@@ -1,2 +1,524 @@
 """Tests for the playback module."""
 from playback import Playback
+from playback.interpolation import interpolate_tracks
+from playback.kinematics import add_kinematics
+from playback.processors.playback_processor import PlaybackProcessor
+from playback.sharding import play_sharded, partition_by_vessel
+from playback.tail import SourceTail, WatermarkWindows
+from splitter import Splitter
+from splitter.catalog import read_catalog
+from splitter.readers import DMAReader
+from tests.constants import DATA_FOLDER
+from datetime import time, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+import os
+
+
+def tracks(rows: list[tuple[int, str, float, float]]) -> pd.DataFrame:
+    """Return a dataframe of reports given as (MMSI, 'YYYY-MM-DD HH:MM:SS', latitude, longitude)."""
+    return pd.DataFrame({
+        'MMSI': [row[0] for row in rows],
+        'TIMESTAMP': pd.to_datetime([row[1] for row in rows]),
+        'LATITUDE': [row[2] for row in rows],
+        'LONGITUDE': [row[3] for row in rows],
+        'SOG': [float(index) for index in range(len(rows))]
+    })
+
+
+def test_interpolate_tracks_linear():
+    dataframe = tracks([
+        (1, '2022-10-15 10:00:00', 55.0, 10.0),
+        (1, '2022-10-15 10:00:20', 55.2, 10.2),
+    ])
+
+    interpolated = interpolate_tracks(dataframe, tick=timedelta(seconds=10), max_gap=timedelta(minutes=1))
+
+    assert interpolated['TIMESTAMP'].dt.strftime('%H:%M:%S').tolist() == ['10:00:00', '10:00:10', '10:00:20']
+    assert interpolated['LATITUDE'].tolist() == pytest.approx([55.0, 55.1, 55.2])
+    assert interpolated['LONGITUDE'].tolist() == pytest.approx([10.0, 10.1, 10.2])
+    # Other columns are taken from the latest report at or before the tick.
+    assert interpolated['SOG'].tolist() == [0.0, 0.0, 1.0]
+
+
+def test_interpolate_tracks_great_circle_along_meridian():
+    dataframe = tracks([
+        (1, '2022-10-15 10:00:00', 55.0, 10.0),
+        (1, '2022-10-15 10:00:20', 55.2, 10.0),
+    ])
+
+    interpolated = interpolate_tracks(dataframe, tick=timedelta(seconds=10), max_gap=timedelta(minutes=1),
+                                      method='great-circle')
+
+    assert interpolated['LATITUDE'].tolist() == pytest.approx([55.0, 55.1, 55.2])
+    assert interpolated['LONGITUDE'].tolist() == pytest.approx([10.0, 10.0, 10.0])
+
+
+def test_interpolate_tracks_leaves_out_ticks_within_large_gaps():
+    dataframe = tracks([
+        (1, '2022-10-15 10:00:00', 55.0, 10.0),
+        (1, '2022-10-15 10:30:00', 55.3, 10.0),
+    ])
+
+    interpolated = interpolate_tracks(dataframe, tick=timedelta(minutes=10), max_gap=timedelta(minutes=10))
+
+    assert interpolated['TIMESTAMP'].dt.strftime('%H:%M').tolist() == ['10:00', '10:30']
+
+
+def test_interpolate_tracks_shares_ticks_between_vessels():
+    dataframe = tracks([
+        (1, '2022-10-15 10:00:03', 55.0, 10.0),
+        (2, '2022-10-15 10:00:05', 56.0, 11.0),
+        (1, '2022-10-15 10:00:23', 55.2, 10.0),
+        (2, '2022-10-15 10:00:25', 56.2, 11.0),
+    ])
+
+    interpolated = interpolate_tracks(dataframe, tick=timedelta(seconds=10), max_gap=timedelta(minutes=1))
+
+    assert interpolated.groupby('TIMESTAMP')['MMSI'].nunique().tolist() == [2, 2]
+    assert interpolated['TIMESTAMP'].dt.strftime('%H:%M:%S').unique().tolist() == ['10:00:10', '10:00:20']
+
+
+def test_interpolate_tracks_interpolates_each_vessel_as_if_alone():
+    dataframe = tracks([
+        (3, '2022-10-15 10:00:01', 57.0, 12.0),
+        (1, '2022-10-15 10:00:00', 55.0, 10.0),
+        (2, '2022-10-15 10:00:05', 56.0, 11.0),
+        (1, '2022-10-15 10:00:40', 55.4, 10.0),
+        (2, '2022-10-15 10:01:05', 56.6, 11.0),
+    ])
+    arguments = {'tick': timedelta(seconds=10), 'max_gap': timedelta(minutes=2)}
+
+    interpolated = interpolate_tracks(dataframe, **arguments)
+
+    for mmsi in [1, 2]:
+        alone = interpolate_tracks(dataframe[dataframe['MMSI'] == mmsi], **arguments)
+
+        pd.testing.assert_frame_equal(interpolated[interpolated['MMSI'] == mmsi].reset_index(drop=True), alone)
+    assert 3 not in interpolated['MMSI'].tolist()
+
+
+def test_interpolate_tracks_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        interpolate_tracks(tracks([(1, '2022-10-15 10:00:00', 55.0, 10.0)]),
+                           tick=timedelta(seconds=10), max_gap=timedelta(minutes=1), method='cubic')
+
+
+def test_memory_mapped_derived_data_round_trip(tmp_path: Path):
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'), memory_map=True)
+    os.makedirs(playback.prepro_derived_folder)
+    rows = 200_000
+    dataframe = pd.DataFrame({
+        'MMSI': np.arange(rows) % 7,
+        'LATITUDE': np.linspace(54.0, 58.0, rows),
+        'TIMESTAMP': pd.date_range('2022-10-15', periods=rows, freq='S')
+    })
+
+    playback._save_feather(dataframe, playback.derived_path)
+
+    with pa.memory_map(playback.derived_path, 'r') as source:
+        assert pa.ipc.open_file(source).num_record_batches == 1
+
+    allocated_before = pa.total_allocated_bytes()
+    loaded = playback._load_derived_playback()
+
+    pd.testing.assert_frame_equal(loaded, dataframe)
+    # The numeric columns are backed by the memory map, not copied into memory allocated by pyarrow.
+    assert pa.total_allocated_bytes() - allocated_before < dataframe['LATITUDE'].nbytes
+
+
+def test_memory_map_requires_prepro_folder():
+    with pytest.raises(ValueError):
+        Playback(source_path='source', memory_map=True)
+
+
+class Collector(PlaybackProcessor):
+    """Processor collecting the window, MMSI and timestamp of every emitted row."""
+
+    def __init__(self, speed: int = 10) -> None:
+        """Initialise the processor."""
+        self.speed = speed
+        self.rows = []
+
+    def begun(self) -> None:
+        """Reset the collected rows."""
+        self.rows = []
+
+    def process(self, dataframe: pd.DataFrame) -> None:
+        """Collect the rows of the emission along with the start of its window."""
+        window = dataframe['TIMESTAMP'].min().floor(f'{self.speed}S')
+        self.rows.extend((window, mmsi, timestamp)
+                         for mmsi, timestamp in zip(dataframe['MMSI'], dataframe['TIMESTAMP']))
+
+    def end(self) -> None:
+        """Do nothing."""
+
+    def result(self) -> list:
+        """Return the collected rows."""
+        return self.rows
+
+
+class RaisingCollector(Collector):
+    """Processor that raises an exception while processing."""
+
+    def process(self, dataframe: pd.DataFrame) -> None:
+        """Raise an exception."""
+        raise ValueError('Processing failed.')
+
+
+class ExitingCollector(Collector):
+    """Processor that kills its process while processing."""
+
+    def process(self, dataframe: pd.DataFrame) -> None:
+        """Exit the process without cleanup."""
+        os._exit(1)
+
+
+class UnpicklableCollector(Collector):
+    """Processor with a result that cannot be pickled."""
+
+    def result(self) -> object:
+        """Return a value that cannot be pickled."""
+        return lambda: None
+
+
+def fleet(vessels: int = 12, reports: int = 30) -> pd.DataFrame:
+    """Return a dataframe of reports every 3 seconds from several vessels."""
+    return pd.DataFrame({
+        'MMSI': np.repeat(np.arange(vessels) + 219000000, reports),
+        'TIMESTAMP': np.tile(pd.date_range('2022-10-15 10:00:00', periods=reports, freq='3S'), vessels),
+        'LATITUDE': np.linspace(55.0, 56.0, vessels * reports),
+        'LONGITUDE': np.linspace(10.0, 11.0, vessels * reports)
+    }).sort_values(by=['TIMESTAMP'], kind='stable').reset_index(drop=True)
+
+
+def test_sharded_playback_matches_local_playback():
+    dataframe = fleet()
+    playback = Playback(source_path='source', processor=Collector())
+
+    playback._play_locally(dataframe, speed=10, no_sleep=True)
+    shard_results = play_sharded(dataframe, processor=Collector(), shards=3, speed=10, no_sleep=True)
+
+    assert len(shard_results) == 3
+    assert all(shard_results)
+    assert sorted(row for result in shard_results for row in result) == sorted(playback.processor.rows)
+
+
+def test_partition_by_vessel_keeps_each_vessel_in_one_shard():
+    shards = partition_by_vessel(fleet(), 4)
+
+    assert sum(shard.shape[0] for shard in shards) == fleet().shape[0]
+    assert sum(shard['MMSI'].nunique() for shard in shards) == fleet()['MMSI'].nunique()
+
+
+@pytest.mark.parametrize('processor', [RaisingCollector(), ExitingCollector(), UnpicklableCollector()])
+def test_sharded_playback_raises_when_a_worker_fails(processor: PlaybackProcessor):
+    with pytest.raises(RuntimeError):
+        play_sharded(fleet(), processor=processor, shards=2, speed=10, no_sleep=True)
+
+
+def test_playback_without_preprocessing_plans_reads_from_catalog(tmp_path: Path):
+    Splitter(target_path=str(tmp_path), reader=DMAReader()).split(
+        source_path=os.path.join(DATA_FOLDER, 'ferry_2day_2vessel.csv'))
+    day_folder = os.path.join(tmp_path, '2022-10-16')
+    vessel = read_catalog(day_folder)['MMSI'].iloc[0]
+
+    playback = Playback(source_path=day_folder, subset=[vessel], processor=Collector())
+
+    assert playback._plan_source_files() == [os.path.join(day_folder, f'{vessel}.csv')]
+
+    playback.play(speed=10, no_sleep=True)
+
+    assert {mmsi for _, mmsi, _ in playback.processor.rows} == {vessel}
+
+
+def write_source(folder: str, rows: list[tuple[int, str, float, float]]) -> None:
+    """Write split source files, one per vessel, for reports given as (MMSI, 'HH:MM:SS', latitude, longitude)."""
+    os.makedirs(folder, exist_ok=True)
+    dataframe = pd.DataFrame({
+        'MMSI': [row[0] for row in rows],
+        'IMO': 0,
+        'NAV STATUS': 'Under way using engine',
+        'SOG': 10.0,
+        'LONGITUDE': [row[3] for row in rows],
+        'LATITUDE': [row[2] for row in rows],
+        'COG': 90.0,
+        'HEADING': 90,
+        'ROT': 0.0,
+        'CALLSIGN': 'OXXL',
+        'SHIP NAME': 'ANE LAESOE',
+        'SHIP TYPE': 'Passenger',
+        'CARGO TYPE': pd.NA,
+        'WIDTH': 15,
+        'LENGTH': 54,
+        'DRAUGHT': 2.9,
+        'DESTINATION': 'LAESOE',
+        'ETA': '22/07/2023 11:00:00',
+        'DATE': '2022-10-15',
+        'TIME': [row[1] for row in rows]
+    })
+
+    for mmsi, vessel in dataframe.groupby('MMSI'):
+        vessel.to_csv(os.path.join(folder, f'{mmsi}.csv'), sep='|', index=False)
+
+
+TWO_AREAS = [
+    (1, '09:30:00', 55.1, 10.1),
+    (1, '10:30:00', 55.2, 10.2),
+    (1, '23:30:00', 55.3, 10.3),
+    (2, '09:30:00', 57.1, 12.1),
+    (2, '10:30:00', 57.2, 12.2),
+]
+
+
+def test_extent_reads_only_overlapping_tiles(tmp_path: Path):
+    write_source(str(tmp_path / 'source'), TWO_AREAS)
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'),
+                        extent=(10.0, 11.0, 55.0, 56.0))
+
+    dataframe = playback._preprocess_or_load()
+
+    base_folder = os.path.join(playback.prepro_base_folder, 'base.parquet')
+    assert len([folder for folder in os.listdir(base_folder) if folder.startswith('TILE=')]) == 2
+    assert not [file for file in os.listdir(playback.prepro_base_folder) if file.endswith('.tmp')]
+    assert dataframe['MMSI'].tolist() == [1, 1, 1]
+    assert playback._load_base_playback()['MMSI'].tolist() == [1, 1, 1]
+
+
+def test_time_interval_skips_base_row_groups(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr('playback.module.BASE_ROW_GROUP_SIZE', 1)
+    write_source(str(tmp_path / 'source'), TWO_AREAS)
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'),
+                        start_time=time(10), stop_time=time(10, 59))
+    playback._preprocess_or_load()
+
+    loaded = playback._load_base_playback()
+
+    assert loaded['TIMESTAMP'].dt.hour.tolist() == [10, 10]
+
+    base = ds.dataset(os.path.join(playback.prepro_base_folder, 'base.parquet'), format='parquet', partitioning='hive')
+    hour_filter = (ds.field('HOUR') >= 10) & (ds.field('HOUR') <= 10)
+    row_groups = [row_group for fragment in base.get_fragments()
+                  for row_group in fragment.split_by_row_group(hour_filter)]
+    assert len(row_groups) == 2
+
+    playback.start_time, playback.stop_time = time(23), time(9, 59)
+
+    assert playback._load_base_playback()['TIMESTAMP'].dt.hour.tolist() == [9, 9, 23]
+
+
+def test_interrupted_base_write_is_not_used(tmp_path: Path):
+    write_source(str(tmp_path / 'source'), TWO_AREAS)
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'))
+    playback._create_preprocessed_folders()
+    # A partial dataset left by an interrupted write of a process with the same process id.
+    os.makedirs(os.path.join(playback.prepro_base_folder, f'base.parquet.{os.getpid()}.tmp', 'TILE=0'))
+
+    assert playback._preprocess_or_load().shape[0] == len(TWO_AREAS)
+
+
+def test_base_write_leaves_other_processes_alone(tmp_path: Path):
+    write_source(str(tmp_path / 'source'), TWO_AREAS)
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'))
+    playback._create_preprocessed_folders()
+    base_folder = os.path.join(playback.prepro_base_folder, 'base.parquet')
+    # The temporary folder of another process still writing, and a base another process has just completed.
+    os.makedirs(os.path.join(f'{base_folder}.1.tmp', 'TILE=0'))
+    os.makedirs(os.path.join(base_folder, 'TILE=0'))
+    Path(base_folder, 'TILE=0', 'part-0.parquet').touch()
+
+    playback._save_tiled_parquet(pd.DataFrame({'TILE': [1], 'HOUR': [10], 'TIMESTAMP': [pd.Timestamp(0)]}),
+                                 base_folder)
+
+    assert os.listdir(base_folder) == ['TILE=0']
+    assert sorted(file for file in os.listdir(playback.prepro_base_folder) if file.startswith('base')) == [
+        'base.parquet', 'base.parquet.1.tmp']
+
+
+def test_base_with_more_tiles_than_the_default_partition_limit(tmp_path: Path):
+    grid = [(latitude, longitude) for latitude in range(-16, 17) for longitude in range(-17, 17)]
+    write_source(str(tmp_path / 'source'), [
+        (1, f'10:{index // 60:02}:{index % 60:02}', latitude / 2 + 0.1, longitude / 2 + 0.1)
+        for index, (latitude, longitude) in enumerate(grid)
+    ])
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'),
+                        extent=(0.0, 0.5, 0.0, 0.5))
+
+    assert len(grid) > 1024
+    assert playback._preprocess_or_load()[['LATITUDE', 'LONGITUDE']].values.tolist() == [[0.1, 0.1]]
+    assert len(os.listdir(os.path.join(playback.prepro_base_folder, 'base.parquet'))) == len(grid)
+
+
+def test_add_kinematics():
+    dataframe = tracks([
+        (1, '2022-10-15 10:00:00', 55.00, 10.0),
+        (2, '2022-10-15 10:00:30', 56.00, 11.0),
+        (1, '2022-10-15 10:01:00', 55.01, 10.0),
+        (1, '2022-10-15 10:02:00', 55.03, 10.0),
+    ])
+    dataframe['COG'] = [350.0, 0.0, 10.0, 15.0]
+
+    kinematics = add_kinematics(dataframe)
+    vessel = kinematics[kinematics['MMSI'] == 1].reset_index(drop=True)
+
+    assert kinematics['TIMESTAMP'].is_monotonic_increasing
+    assert kinematics.loc[kinematics['MMSI'] == 2, 'DISTANCE'].isna().all()
+    assert vessel['TIME SINCE LAST'].tolist()[1:] == [60.0, 60.0]
+    assert vessel['DISTANCE'].tolist()[1:] == pytest.approx([1111.95, 2223.9], rel=1e-4)
+    assert vessel['IMPLIED SPEED'].tolist()[1:] == pytest.approx([36.02, 72.04], rel=1e-3)
+    assert vessel['ACCELERATION'][2] == pytest.approx(36.02 / 60, rel=1e-3)
+    assert vessel['TURN RATE'].tolist()[1:] == pytest.approx([20.0, 5.0])
+
+
+@pytest.mark.parametrize('preprocessed', [True, False])
+def test_extended_kinematics_use_previous_report_outside_filters(tmp_path: Path, preprocessed: bool):
+    write_source(str(tmp_path / 'source'), [
+        (1, '10:00:00', 55.1, 10.1),
+        (1, '10:01:00', 55.1, 11.5),
+        (1, '10:02:00', 55.1, 10.2),
+    ])
+    playback = Playback(source_path=str(tmp_path / 'source'),
+                        prepro_folder=str(tmp_path / 'prepro') if preprocessed else None,
+                        player='extended',
+                        extent=(10.0, 11.0, 55.0, 56.0))
+
+    dataframe = playback._preprocess_or_load()
+
+    assert dataframe['TIMESTAMP'].dt.strftime('%H:%M').tolist() == ['10:00', '10:02']
+    assert dataframe['TIME SINCE LAST'].tolist()[1] == 60.0
+    assert dataframe['SHIP NAME'].tolist() == ['ANE LAESOE', 'ANE LAESOE']
+
+
+def windows_of(emissions: list[tuple[pd.Timestamp, pd.DataFrame]]) -> list[tuple[str, list[int]]]:
+    """Return the start of each emission as 'HH:MM:SS' along with the MMSI of each of its rows."""
+    return [(start.strftime('%H:%M:%S'), rows['MMSI'].tolist()) for start, rows in emissions]
+
+
+def test_watermark_windows_emit_once_the_watermark_passes():
+    windows = WatermarkWindows(window=timedelta(seconds=10), watermark_delay=timedelta(seconds=5), late_policy='drop')
+
+    assert windows.add(tracks([(1, '2022-10-15 10:00:01', 55.0, 10.0),
+                               (2, '2022-10-15 10:00:12', 55.0, 10.0)])) == []
+    assert windows_of(windows.add(tracks([(3, '2022-10-15 10:00:15', 55.0, 10.0)]))) == [('10:00:00', [1])]
+    assert windows_of(windows.flush()) == [('10:00:10', [2, 3])]
+
+
+@pytest.mark.parametrize('late_policy, emitted', [
+    ('drop', [('10:00:20', [1])]),
+    ('emit', [('10:00:03', [2]), ('10:00:20', [1])]),
+    ('next', [('10:00:20', [2, 1])]),
+])
+def test_watermark_windows_handle_late_rows(late_policy: str, emitted: list[tuple[str, list[int]]]):
+    windows = WatermarkWindows(window=timedelta(seconds=10), watermark_delay=timedelta(seconds=0),
+                               late_policy=late_policy)
+    windows.add(tracks([(1, '2022-10-15 10:00:01', 55.0, 10.0), (1, '2022-10-15 10:00:25', 55.0, 10.0)]))
+
+    emissions = windows.add(tracks([(2, '2022-10-15 10:00:03', 55.0, 10.0)]))
+    emissions += windows.add(tracks([(3, '2022-10-15 10:00:30', 55.0, 10.0)]))
+
+    assert windows_of(emissions) == emitted
+    assert windows.late_rows == 1
+
+
+def test_watermark_windows_flush_late_rows_carried_to_the_next_window():
+    windows = WatermarkWindows(window=timedelta(seconds=10), watermark_delay=timedelta(seconds=0), late_policy='next')
+    windows.add(tracks([(1, '2022-10-15 10:00:01', 55.0, 10.0)]), latest=pd.Timestamp('2022-10-15 10:00:30'))
+
+    assert windows.add(tracks([(2, '2022-10-15 10:00:03', 55.0, 10.0)])) == []
+    assert windows_of(windows.flush()) == [('10:00:03', [2])]
+    assert windows.flush() == []
+
+
+def test_tail_watermark_advances_on_rows_removed_by_filters(tmp_path: Path):
+    playback = Playback(source_path=str(tmp_path), subset=[1], processor=Collector())
+    windows = WatermarkWindows(window=timedelta(seconds=10), watermark_delay=timedelta(seconds=5), late_policy='drop')
+    write_source(str(tmp_path), [(1, '10:00:01', 55.0, 10.0), (2, '10:00:02', 57.0, 12.0)])
+    source = SourceTail(str(tmp_path))
+
+    assert playback._add_tailed(windows, source.read_new()) == []
+
+    write_source(str(tmp_path), [(2, '10:00:02', 57.0, 12.0), (2, '10:00:30', 57.0, 12.0)])
+    os.remove(tmp_path / '1.csv')
+    emissions = playback._add_tailed(windows, source.read_new())
+
+    assert windows_of(emissions) == [('10:00:00', [1])]
+
+
+def test_source_tail_reads_only_complete_appended_lines(tmp_path: Path):
+    write_source(str(tmp_path), [(1, '10:00:00', 55.0, 10.0)])
+    file = tmp_path / '1.csv'
+    line = file.read_text().splitlines()[1]
+    source = SourceTail(str(tmp_path))
+
+    assert source.read_new()['TIME'].tolist() == ['10:00:00']
+    assert source.read_new() is None
+
+    with open(file, 'a') as appended:
+        appended.write(line.replace('10:00:00', '10:00:05') + '\n' + line[:20])
+
+    assert source.read_new()['TIME'].tolist() == ['10:00:05']
+
+    with open(file, 'a') as appended:
+        appended.write(line[20:].replace('10:00:00', '10:00:09') + '\n')
+
+    assert source.read_new()['TIME'].tolist() == ['10:00:09']
+
+
+def test_source_tail_keeps_polling_a_rotated_source_file(tmp_path: Path):
+    write_source(str(tmp_path), [(1, '10:00:00', 55.0, 10.0)])
+    source = SourceTail(str(tmp_path / '1.csv'))
+    source.read_new()
+    os.rename(tmp_path / '1.csv', tmp_path / '1.csv.1')
+
+    assert source.read_new() is None
+    assert source.offsets == {}
+
+    write_source(str(tmp_path), [(1, '10:00:05', 55.0, 10.0)])
+
+    assert source.read_new()['TIME'].tolist() == ['10:00:05']
+
+
+def test_tail_of_a_missing_source_ends_the_processor(tmp_path: Path):
+    playback = Playback(source_path=str(tmp_path / '1.csv'), processor=Collector())
+    ended = []
+    playback.processor.end = lambda: ended.append(True)
+
+    playback.tail(poll_interval=0.01, idle_timeout=0.05)
+
+    assert ended == [True]
+
+
+def test_source_tail_skips_files_that_disappear(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    write_source(str(tmp_path), [(1, '10:00:00', 55.0, 10.0), (2, '10:00:00', 57.0, 12.0)])
+    source = SourceTail(str(tmp_path))
+    source.read_new()
+
+    os.remove(tmp_path / '1.csv')
+    monkeypatch.setattr('playback.tail.collect_files', lambda *_: [str(tmp_path / '1.csv'), str(tmp_path / '2.csv')])
+
+    assert source.read_new() is None
+    assert list(source.offsets) == [(os.stat(tmp_path / '2.csv').st_dev, os.stat(tmp_path / '2.csv').st_ino)]
+
+
+def test_extended_player_reads_only_the_base_within_the_filters(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    write_source(str(tmp_path / 'source'), TWO_AREAS)
+    playback = Playback(source_path=str(tmp_path / 'source'), prepro_folder=str(tmp_path / 'prepro'),
+                        player='extended', extent=(10.0, 11.0, 55.0, 56.0), start_time=time(9), stop_time=time(11))
+    playback._preprocess_or_load()
+    read_filters = []
+    read_parquet = pd.read_parquet
+
+    def recording_read_parquet(path: str, **kwargs: object) -> pd.DataFrame:
+        read_filters.append(kwargs.get('filters'))
+        return read_parquet(path, **kwargs)
+
+    monkeypatch.setattr('playback.module.pd.read_parquet', recording_read_parquet)
+    loaded = playback._load_base_playback()
+
+    assert read_filters == [playback._base_filters()]
+    assert loaded['MMSI'].tolist() == [1, 1]
+    assert loaded['TIME SINCE LAST'].tolist()[1] == 3600.0
@@ -1,2 +1,223 @@
 """Tests for the splitter module."""
 from splitter.module import Splitter
+from splitter.readers import DMAReader
+from splitter.catalog import read_catalog, plan_files
+from helper_functions import collect_files, combine_date_and_time
+from datetime import date, time, timedelta
+from tests.constants import DATA_FOLDER
+from tests.test_helpers.folders_and_files import number_of_folders_in_folder, number_of_files_in_folder
+import pandas as pd
+import pytest
+import shutil
+import os
+from pathlib import Path
+
+
+def reports(rows: list[tuple[int, str, float, float]]) -> pd.DataFrame:
+    """Return a dataframe of reports given as (MMSI, 'HH:MM:SS', latitude, longitude) on the same date."""
+    return pd.DataFrame({
+        'MMSI': [row[0] for row in rows],
+        'DATE': [date(2022, 10, 15)] * len(rows),
+        'TIME': [time.fromisoformat(row[1]) for row in rows],
+        'LATITUDE': [row[2] for row in rows],
+        'LONGITUDE': [row[3] for row in rows]
+    })
+
+
+def test_remove_duplicates_merges_positions_within_tolerance():
+    dataframe = reports([
+        (1, '10:00:00', 55.0000049, 10.0),
+        (1, '10:00:00', 55.0000051, 10.0),
+        (1, '10:00:00', 55.0000049, 10.0),
+    ])
+
+    assert Splitter._remove_duplicates(dataframe).shape[0] == 1
+
+
+def test_remove_duplicates_keeps_distinct_reports():
+    dataframe = reports([
+        (1, '10:00:00', 55.0, 10.0),
+        (1, '10:00:00', 55.001, 10.0),
+        (1, '10:00:01', 55.0, 10.0),
+        (2, '10:00:00', 55.0, 10.0),
+    ])
+
+    assert Splitter._remove_duplicates(dataframe).shape[0] == 4
+
+
+def test_downsample_enforces_minimum_interval():
+    dataframe = reports([
+        (1, '10:00:59', 55.0, 10.0),
+        (1, '10:01:00', 55.0, 10.0),
+        (1, '10:01:58', 55.0, 10.0),
+        (1, '10:01:59', 55.0, 10.0),
+        (1, '10:03:00', 55.0, 10.0),
+    ])
+
+    downsampled = Splitter._downsample(dataframe, timedelta(minutes=1))
+
+    assert downsampled['TIME'].astype(str).tolist() == ['10:00:59', '10:01:59', '10:03:00']
+
+
+def test_downsample_is_per_vessel():
+    dataframe = reports([
+        (1, '10:00:00', 55.0, 10.0),
+        (2, '10:00:01', 55.0, 10.0),
+        (1, '10:00:02', 55.0, 10.0),
+        (2, '10:00:40', 55.0, 10.0),
+    ])
+
+    downsampled = Splitter._downsample(dataframe, timedelta(seconds=30))
+
+    assert downsampled.index.tolist() == [0, 1, 3]
+
+
+def test_combine_date_and_time_keeps_index():
+    dataframe = reports([(1, '10:00:00', 55.0, 10.0), (1, '23:59:59.500000', 55.0, 10.0)]).set_index(pd.Index([7, 3]))
+
+    timestamps = combine_date_and_time(dataframe['DATE'], dataframe['TIME'])
+
+    assert timestamps.to_dict() == {7: pd.Timestamp('2022-10-15 10:00:00'), 3: pd.Timestamp('2022-10-15 23:59:59.5')}
+
+
+def test_split_with_downsampling_keeps_minimum_interval(tmp_path: Path):
+    Splitter(target_path=str(tmp_path), reader=DMAReader()).split(
+        source_path=os.path.join(DATA_FOLDER, 'ferry_2day_2vessel.csv'),
+        deduplicate=True,
+        downsample_interval=timedelta(seconds=10))
+
+    assert number_of_folders_in_folder(str(tmp_path)) == 2
+
+    for day_folder in os.listdir(tmp_path):
+        if not os.path.isdir(os.path.join(tmp_path, day_folder)):
+            continue
+        for vessel_file in collect_files(os.path.join(tmp_path, day_folder), 'csv'):
+            vessel = pd.read_csv(vessel_file, sep='|')
+            timestamps = pd.to_datetime(vessel['DATE'] + ' ' + vessel['TIME'])
+
+            assert (timestamps.diff().dropna() >= pd.Timedelta(seconds=10)).all()
+
+
+def split_two_days(target_path: str) -> str:
+    """Split the two day, two vessel test data and return the folder of the second day."""
+    Splitter(target_path=target_path, reader=DMAReader()).split(
+        source_path=os.path.join(DATA_FOLDER, 'ferry_2day_2vessel.csv'))
+
+    return os.path.join(target_path, '2022-10-16')
+
+
+def test_split_writes_catalog_per_day(tmp_path: Path):
+    day_folder = split_two_days(str(tmp_path))
+
+    catalog = read_catalog(day_folder)
+
+    assert catalog.shape[0] == number_of_files_in_folder(day_folder) - 1
+    for _, entry in catalog.iterrows():
+        vessel = pd.read_csv(os.path.join(day_folder, entry['FILE']), sep='|')
+
+        assert entry['ROWS'] == vessel.shape[0]
+        assert entry['BYTES'] == os.path.getsize(os.path.join(day_folder, entry['FILE']))
+        assert entry['MIN LATITUDE'] == vessel['LATITUDE'].min()
+        assert entry['MAX LONGITUDE'] == vessel['LONGITUDE'].max()
+
+
+def test_plan_files_prunes_by_time_and_vessel(tmp_path: Path):
+    day_folder = split_two_days(str(tmp_path))
+    catalog = read_catalog(day_folder)
+    first, last = catalog.sort_values(by=['MIN TIMESTAMP'])['MMSI'].tolist()
+
+    assert len(plan_files(catalog, day_folder)) == 2
+    assert plan_files(catalog, day_folder, start_time=time(0, 0, 30)) == [os.path.join(day_folder, f'{last}.csv')]
+    assert plan_files(catalog, day_folder, stop_time=time(0, 0, 10)) == [os.path.join(day_folder, f'{first}.csv')]
+    assert plan_files(catalog, day_folder, mmsis=[first]) == [os.path.join(day_folder, f'{first}.csv')]
+    assert plan_files(catalog, day_folder, start_time=time(1), stop_time=time(2)) == []
+
+
+def test_plan_files_prunes_by_extent(tmp_path: Path):
+    day_folder = split_two_days(str(tmp_path))
+    catalog = read_catalog(day_folder)
+
+    assert len(plan_files(catalog, day_folder, extent=(10.0, 11.0, 57.0, 58.0))) == 2
+    assert plan_files(catalog, day_folder, extent=(11.0, 12.0, 57.0, 58.0)) == []
+
+
+def count_split_files(monkeypatch: pytest.MonkeyPatch, fail_on: int | None = None) -> list[str]:
+    """Record the source files split by the splitter, optionally failing on the given call to simulate a crash."""
+    split_files = []
+    split_file = Splitter._split_file
+
+    def recording_split_file(self: Splitter, file: str, *args: object) -> list[str]:
+        split_files.append(file)
+        if len(split_files) == fail_on:
+            raise RuntimeError('Simulated crash')
+        return split_file(self, file, *args)
+
+    monkeypatch.setattr(Splitter, '_split_file', recording_split_file)
+
+    return split_files
+
+
+def two_source_files(folder: Path) -> str:
+    """Copy two source files to a folder and return the folder."""
+    os.makedirs(folder)
+    for file in ['ferry_2day_2vessel.csv', 'ferry_1line.csv']:
+        shutil.copy(os.path.join(DATA_FOLDER, file), folder)
+
+    return str(folder)
+
+
+def test_resume_skips_finished_source_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source_path = two_source_files(tmp_path / 'source')
+    splitter = Splitter(target_path=str(tmp_path / 'target'), reader=DMAReader())
+
+    with monkeypatch.context() as patch:
+        crashed = count_split_files(patch, fail_on=2)
+        with pytest.raises(RuntimeError):
+            splitter.split(source_path=source_path)
+
+    resumed = count_split_files(monkeypatch)
+    splitter.split(source_path=source_path, resume=True)
+
+    assert resumed == [crashed[1]]
+
+    splitter.split(source_path=source_path, resume=True)
+
+    assert resumed == [crashed[1]]
+
+
+def test_resume_splits_again_with_other_options(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source_path = two_source_files(tmp_path / 'source')
+    splitter = Splitter(target_path=str(tmp_path / 'target'), reader=DMAReader())
+    splitter.split(source_path=source_path)
+
+    split_files = count_split_files(monkeypatch)
+    splitter.split(source_path=source_path, resume=True, deduplicate=True, downsample_interval=timedelta(seconds=10))
+
+    assert len(split_files) == 2
+
+
+def test_split_output_is_on_disk_before_the_journal_entry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    synced = []
+    fsync = os.fsync
+
+    def recording_fsync(descriptor: int) -> None:
+        synced.append(os.fstat(descriptor).st_ino)
+        fsync(descriptor)
+
+    monkeypatch.setattr('splitter.journal.os.fsync', recording_fsync)
+    day_folder = split_two_days(str(tmp_path))
+
+    journal = synced.index(os.stat(tmp_path / 'split_journal.jsonl').st_ino)
+    for path in [day_folder, tmp_path, *collect_files(day_folder, '.csv'), os.path.join(day_folder, 'catalog.parquet')]:
+        assert os.stat(path).st_ino in synced[:journal]
+
+
+def test_split_removes_temporary_files(tmp_path: Path):
+    day_folder = os.path.join(tmp_path, '2022-10-16')
+    os.makedirs(day_folder)
+    with open(os.path.join(day_folder, '219000734.csv.tmp'), 'w') as file:
+        file.write('partial')
+
+    split_two_days(str(tmp_path))
+
+    assert not any(file.endswith('.tmp') for _, _, files in os.walk(tmp_path) for file in files)